@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta, timezone
+
+from django.db.models import Case, Count, DurationField, ExpressionWrapper, F, IntegerField, OuterRef, Subquery, \
+    Sum, Value, When
+from django.db.models.functions import ExtractHour, TruncDate
+from django.utils import timezone as django_timezone
+
+from .models import Availability, Appointment, AppointmentArchive
+
+
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+BUSIEST_HOURS = 3
+
+
+def duration():
+    return ExpressionWrapper(F('end_time') - F('start_time'), output_field=DurationField())
+
+
+def weekday_counts(start_date, end_date):
+    """Number of times each weekday occurs between two dates, both inclusive."""
+    counts = {}
+    for offset, day in enumerate(DAYS):
+        first = start_date + timedelta(days=(offset - start_date.weekday()) % 7)
+        counts[day] = (end_date - first).days // 7 + 1 if first <= end_date else 0
+    return counts
+
+
+def owner_utilization(owners, start_date, end_date):
+    """
+    Booked hours, available hours, utilization and busiest hours of every owner in the `owners`
+    queryset between two dates (inclusive, UTC). Available hours are the owners' weekly availability
+    weighted by how often each weekday occurs in the range. Booked hours count archived appointments
+    too. Runs three aggregate queries whatever the number of owners, plus two more on the archive
+    when the range starts in the past.
+    """
+    range_start = datetime.combine(start_date, datetime.min.time(), tzinfo=timezone.utc)
+    range_end = datetime.combine(end_date + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+
+    models = [Appointment]
+    if range_start < django_timezone.now():
+        # Only appointments that have ended are archived, so future ranges never need the archive.
+        models.append(AppointmentArchive)
+
+    sources = [
+        model.objects.using(owners.db).filter(
+            calendar_owner__in=owners,
+            start_time__gte=range_start,
+            start_time__lt=range_end
+        )
+        for model in models
+    ]
+
+    booked = {
+        f'booked_{index}': Subquery(
+            appointments.filter(calendar_owner=OuterRef('pk'))
+            .values('calendar_owner')
+            .annotate(total=Sum(duration()))
+            .values('total'),
+            output_field=DurationField()
+        )
+        for index, appointments in enumerate(sources)
+    }
+
+    weekday_weight = Case(
+        *[When(day_of_week__iexact=day, then=Value(count)) for day, count in weekday_counts(start_date, end_date).items()],
+        default=Value(0),
+        output_field=IntegerField()
+    )
+    capacity = Availability.objects.using(owners.db).filter(calendar_owner=OuterRef('pk')) \
+        .values('calendar_owner') \
+        .annotate(total=Sum(ExpressionWrapper(duration() * weekday_weight, output_field=DurationField()))) \
+        .values('total')
+
+    rows = owners.annotate(
+        **booked,
+        capacity=Subquery(capacity, output_field=DurationField())
+    ).order_by('email').values('id', 'name', 'email', 'capacity', *booked)
+
+    hourly_counts = {}
+    daily_booked = {}
+    for appointments in sources:
+        for row in appointments.annotate(hour=ExtractHour('start_time')) \
+                .values('calendar_owner_id', 'hour') \
+                .annotate(appointments=Count('id')) \
+                .order_by():
+            key = (row['calendar_owner_id'], row['hour'])
+            hourly_counts[key] = hourly_counts.get(key, 0) + row['appointments']
+
+        for row in appointments.annotate(date=TruncDate('start_time')) \
+                .values('calendar_owner_id', 'date') \
+                .annotate(booked=Sum(duration())) \
+                .order_by():
+            key = (row['calendar_owner_id'], row['date'])
+            daily_booked[key] = daily_booked.get(key, timedelta()) + row['booked']
+
+    busiest_hours = {}
+    for (owner_id, hour), count in sorted(hourly_counts.items(), key=lambda item: (item[0][0], -item[1], item[0][1])):
+        hours = busiest_hours.setdefault(owner_id, [])
+        if len(hours) < BUSIEST_HOURS:
+            hours.append({'hour': hour, 'appointments': count})
+
+    daily_booked_hours = {}
+    for (owner_id, day), total in sorted(daily_booked.items()):
+        daily_booked_hours.setdefault(owner_id, {})[day.isoformat()] = hours_of(total)
+
+    report = []
+    for row in rows:
+        booked_hours = hours_of(sum((row[name] for name in booked if row[name]), timedelta()))
+        available_hours = hours_of(row['capacity'])
+        report.append({
+            'owner_name': row['name'],
+            'owner_email': row['email'],
+            'booked_hours': booked_hours,
+            'available_hours': available_hours,
+            'utilization': round(booked_hours / available_hours * 100, 2) if available_hours else None,
+            'busiest_hours': busiest_hours.get(row['id'], []),
+            'daily_booked_hours': daily_booked_hours.get(row['id'], {}),
+        })
+    return report
+
+
+def hours_of(value):
+    return round(value.total_seconds() / 3600, 2) if value else 0
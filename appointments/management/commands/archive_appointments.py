@@ -0,0 +1,89 @@
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from appointments.models import Appointment, AppointmentArchive
+from appointments.routers import selected_shards
+
+
+ARCHIVED_FIELDS = ['id', 'calendar_owner_id', 'invitee_name', 'invitee_email', 'start_time', 'end_time', 'agenda']
+
+
+class Command(BaseCommand):
+    help = """
+    Move appointments that ended before a date from the live Appointment table into AppointmentArchive.
+    Rows are moved in batches, each in its own transaction, so the command can be interrupted and
+    simply run again to resume. Every shard is archived in turn unless --database is given.
+    -----------------------------------------------------------------
+    Example:
+        python manage.py archive_appointments --before 2024-01-01 --batch-size 1000
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--before', required=True,
+                            help="Archive appointments ending before this date (YYYY-MM-DD, UTC). Cannot be in the future.")
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Number of appointments moved per transaction.")
+        parser.add_argument('--database',
+                            help="Only process this shard (database alias). Defaults to every shard.")
+
+    def handle(self, *args, **options):
+        before = parse_date(options['before'])
+        batch_size = options['batch_size']
+
+        if before is None:
+            raise CommandError("--before must be a date in YYYY-MM-DD format.")
+        if batch_size < 1:
+            raise CommandError("--batch-size must be a positive integer.")
+
+        try:
+            shards = selected_shards(options['database'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        cutoff = datetime.combine(before, datetime.min.time(), tzinfo=dt_timezone.utc)
+        if cutoff > timezone.now():
+            raise CommandError("--before cannot be in the future: bookings only check live appointments.")
+
+        archived = 0
+        started = time.monotonic()
+
+        for shard in shards:
+            while True:
+                moved = archive_batch(cutoff, batch_size, using=shard)
+                if not moved:
+                    break
+
+                archived += moved
+                elapsed = time.monotonic() - started
+                self.stdout.write(f"Archived {archived} appointments ({archived / elapsed:.0f} rows/s)")
+
+        self.stdout.write(self.style.SUCCESS(f"Archive finished: {archived} appointments moved."))
+
+
+def archive_batch(cutoff, batch_size, using='default'):
+    """
+    Copy one batch of appointments ending before `cutoff` into the archive and delete them.
+    The cutoff is clamped to now: only ended appointments may leave the live table.
+    """
+    cutoff = min(cutoff, timezone.now())
+    with transaction.atomic(using=using):
+        rows = list(
+            Appointment.objects.using(using).filter(end_time__lte=cutoff)
+            .order_by('id')
+            .values(*ARCHIVED_FIELDS)[:batch_size]
+        )
+        if not rows:
+            return 0
+
+        AppointmentArchive.objects.using(using).bulk_create(
+            [AppointmentArchive(**row) for row in rows],
+            ignore_conflicts=True
+        )
+        Appointment.objects.using(using).filter(id__in=[row['id'] for row in rows]).delete()
+
+    return len(rows)
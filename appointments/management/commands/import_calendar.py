@@ -0,0 +1,441 @@
+import csv
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import islice
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime, parse_time
+
+from appointments.models import CalendarOwner, Availability, Appointment
+from appointments.routers import run_on_shards, shard_for_email
+from appointments.serializers import merge_time_slots
+
+
+VALID_DAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+ICS_DAYS = {'MO': 'Monday', 'TU': 'Tuesday', 'WE': 'Wednesday', 'TH': 'Thursday',
+            'FR': 'Friday', 'SA': 'Saturday', 'SU': 'Sunday'}
+
+
+class Command(BaseCommand):
+    help = """
+    Import calendar owners, weekly availability and appointments from a CSV or ICS file.
+    The file is streamed and imported in batches, so it is never loaded fully into memory.
+    Each batch is split by owner shard and the shards are written in parallel.
+    -----------------------------------------------------------------
+    CSV columns (header row required):
+        record, owner_email, owner_name, day_of_week, start_time, end_time,
+        invitee_name, invitee_email, agenda
+
+        record=availability rows use day_of_week and HH:MM:SS times.
+        record=appointment rows use ISO 8601 date-times; end_time defaults
+        to one hour after start_time.
+    ICS:
+        Every VEVENT needs an ORGANIZER (the calendar owner). Events with a
+        weekly RRULE become availability, all other events become appointments
+        with the first ATTENDEE as invitee. All-day events are not supported.
+
+    Invalid rows and events (bad emails, dates or times) are skipped and
+    reported on stderr, so one bad row never stops a large import halfway.
+    -----------------------------------------------------------------
+    Example:
+        python manage.py import_calendar team.csv --batch-size 10000
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Path to a .csv or .ics file.")
+        parser.add_argument('--format', choices=['csv', 'ics'],
+                            help="File format, inferred from the file extension by default.")
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help="Number of rows written per transaction.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or path.rsplit('.', 1)[-1].lower()
+        batch_size = options['batch_size']
+
+        if file_format not in ('csv', 'ics'):
+            raise CommandError("Cannot infer the file format, pass --format csv or --format ics.")
+        if batch_size < 1:
+            raise CommandError("--batch-size must be a positive integer.")
+
+        owner_ids = {}
+        imported = 0
+        skipped = 0
+        started = time.monotonic()
+
+        def skip(location, error):
+            nonlocal skipped
+            skipped += 1
+            self.stderr.write(f"Skipped {location}: {error}")
+
+        with open(path, newline='', encoding='utf-8') as source:
+            records = iter_csv_records(source, skip) if file_format == 'csv' else iter_ics_records(source, skip)
+
+            while True:
+                batch = list(islice(records, batch_size))
+                if not batch:
+                    break
+
+                shards = {}
+                for record in batch:
+                    shards.setdefault(shard_for_email(record['owner_email']), []).append(record)
+
+                def import_shard(shard):
+                    with transaction.atomic(using=shard):
+                        import_batch(shards[shard], owner_ids, using=shard)
+
+                run_on_shards(import_shard, list(shards))
+
+                imported += len(batch)
+                elapsed = time.monotonic() - started
+                self.stdout.write(f"Imported {imported} rows ({imported / elapsed:.0f} rows/s)")
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Import finished: {imported} rows from {len(owner_ids)} owners in {elapsed:.2f}s."
+        ))
+        if skipped:
+            self.stderr.write(self.style.WARNING(f"Skipped {skipped} invalid rows or events."))
+
+
+def import_batch(batch, owner_ids, using='default'):
+    """
+    Upsert one batch of parsed records whose owners all live on the `using` shard. `owner_ids`
+    maps owner emails to primary keys and is shared between batches so every owner is resolved
+    only once per import.
+    """
+    resolve_owners(batch, owner_ids, using)
+
+    windows = {}
+    appointments = []
+
+    for record in batch:
+        if record['record'] == 'availability':
+            windows.setdefault((record['owner_email'], record['day_of_week']), set()).add(
+                (record['start_time'], record['end_time'])
+            )
+        else:
+            appointments.append(Appointment(
+                calendar_owner_id=owner_ids[record['owner_email']],
+                invitee_name=record['invitee_name'],
+                invitee_email=record['invitee_email'],
+                start_time=record['start_time'],
+                end_time=record['end_time'],
+                agenda=record['agenda']
+            ))
+
+    if windows:
+        save_availability(windows, owner_ids, using)
+
+    if appointments:
+        Appointment.objects.using(using).bulk_create(
+            appointments,
+            update_conflicts=True,
+            unique_fields=['calendar_owner', 'start_time'],
+            update_fields=['invitee_name', 'invitee_email', 'end_time', 'agenda']
+        )
+
+
+def save_availability(windows, owner_ids, using='default'):
+    """
+    Merge the imported (start_time, end_time) windows of every (owner email, day) with the windows
+    already stored for that owner and day, with the same normalization as the availability setup
+    endpoint. Imports are additive, so overlapping windows are joined instead of rejected, and
+    importing the same file twice changes nothing.
+    """
+    owner_emails = {owner_ids[email]: email for email, _ in windows}
+    stored = {}
+
+    for window in Availability.objects.using(using).filter(
+        calendar_owner_id__in=owner_emails,
+        day_of_week__in={day for _, day in windows}
+    ):
+        key = (owner_emails[window.calendar_owner_id], window.day_of_week)
+        if key in windows:
+            stored.setdefault(key, {})[(window.start_time, window.end_time)] = window.id
+
+    stale = []
+    created = []
+
+    for (email, day), imported in windows.items():
+        current = stored.get((email, day), {})
+        # Inverted windows are rejected while parsing, so the only errors left are overlaps,
+        # which merge_time_slots has already joined.
+        merged, _ = merge_time_slots([
+            {'start_time': start_time, 'end_time': end_time} for start_time, end_time in imported | current.keys()
+        ])
+
+        merged = {(window['start_time'], window['end_time']) for window in merged}
+        stale.extend(window_id for window, window_id in current.items() if window not in merged)
+        created.extend(
+            Availability(calendar_owner_id=owner_ids[email], day_of_week=day, start_time=start_time, end_time=end_time)
+            for start_time, end_time in merged - current.keys()
+        )
+
+    if stale:
+        Availability.objects.using(using).filter(id__in=stale).delete()
+    if created:
+        Availability.objects.using(using).bulk_create(created)
+
+
+def resolve_owners(batch, owner_ids, using='default'):
+    """Create or rename the owners referenced in a batch with two bulk queries and cache their ids."""
+    named_owners = {}
+    unnamed_owners = set()
+
+    for record in batch:
+        if record['owner_name']:
+            named_owners[record['owner_email']] = record['owner_name']
+        elif record['owner_email'] not in owner_ids:
+            unnamed_owners.add(record['owner_email'])
+
+    unnamed_owners.difference_update(named_owners)
+
+    owners = CalendarOwner.objects.using(using)
+
+    if named_owners:
+        owners.bulk_create(
+            [CalendarOwner(name=name, email=email) for email, name in named_owners.items()],
+            update_conflicts=True,
+            unique_fields=['email'],
+            update_fields=['name']
+        )
+
+    if unnamed_owners:
+        owners.bulk_create(
+            [CalendarOwner(name=email.split('@')[0], email=email) for email in unnamed_owners],
+            ignore_conflicts=True
+        )
+
+    missing = {record['owner_email'] for record in batch} - owner_ids.keys()
+    if missing:
+        owner_ids.update(owners.filter(email__in=missing).values_list('email', 'id'))
+
+
+def iter_csv_records(source, skip):
+    """Yield normalized records from a CSV file object, one row at a time. Invalid rows are passed to `skip`."""
+    reader = csv.DictReader(source)
+
+    for row in reader:
+        row = {key.strip().lower(): (value or '').strip() for key, value in row.items() if key}
+        try:
+            yield parse_record(row)
+        except ValueError as e:
+            skip(f"line {reader.line_num}", e)
+
+
+def parse_record(row):
+    record_type = row.get('record', '').lower()
+    owner_email = row.get('owner_email', '').lower()
+
+    check_email(owner_email, 'owner_email')
+
+    record = {
+        'record': record_type,
+        'owner_email': owner_email,
+        'owner_name': row.get('owner_name', ''),
+    }
+
+    if record_type == 'availability':
+        day_of_week = row.get('day_of_week', '').lower()
+        if day_of_week not in VALID_DAYS:
+            raise ValueError(f"{row.get('day_of_week')} is not a valid day.")
+
+        start_time = parse_time(row.get('start_time', ''))
+        end_time = parse_time(row.get('end_time', ''))
+        if start_time is None or end_time is None:
+            raise ValueError("start_time and end_time must be HH:MM:SS times.")
+
+        record.update(day_of_week=day_of_week.capitalize(), start_time=start_time, end_time=end_time)
+
+    elif record_type == 'appointment':
+        start_time = parse_aware_datetime(row.get('start_time', ''))
+        end_time = parse_aware_datetime(row['end_time']) if row.get('end_time') else start_time + timedelta(hours=1)
+
+        invitee_email = row.get('invitee_email', '').lower()
+        if invitee_email:
+            check_email(invitee_email, 'invitee_email')
+
+        record.update(
+            invitee_name=row.get('invitee_name', ''),
+            invitee_email=invitee_email,
+            start_time=start_time,
+            end_time=end_time,
+            agenda=row.get('agenda', '')
+        )
+
+    else:
+        raise ValueError(f"Unknown record type '{row.get('record', '')}'.")
+
+    if record['start_time'] > record['end_time']:
+        raise ValueError("start time must be before end time.")
+
+    return record
+
+
+def check_email(value, field):
+    if not value:
+        raise ValueError(f"{field} is required.")
+    try:
+        validate_email(value)
+    except ValidationError:
+        raise ValueError(f"'{value}' is not a valid {field}.")
+
+
+def parse_aware_datetime(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(f"'{value}' is not a valid ISO 8601 date-time.")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
+
+
+def iter_ics_records(source, skip):
+    """Yield normalized records from the VEVENTs of an iCalendar file object. Invalid events are passed to `skip`."""
+    event = None
+
+    for line_number, name, params, value in iter_ics_properties(source):
+        if name == 'BEGIN' and value.upper() == 'VEVENT':
+            event = {}
+        elif name == 'END' and value.upper() == 'VEVENT':
+            try:
+                # Parse the whole event first, so an invalid event yields none of its records.
+                yield from list(parse_ics_event(event or {}))
+            except ValueError as e:
+                skip(f"event ending on line {line_number}", e)
+            event = None
+        elif event is not None and name not in event:
+            event[name] = (params, value)
+
+
+def iter_ics_properties(source):
+    """Unfold content lines (RFC 5545 3.1) and split them into name, parameters and value."""
+    pending = None
+    pending_line = 0
+
+    for line_number, line in enumerate(source, start=1):
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and pending is not None:
+            pending += line[1:]
+            continue
+        if pending:
+            yield parse_ics_line(pending_line, pending)
+        pending, pending_line = line, line_number
+
+    if pending:
+        yield parse_ics_line(pending_line, pending)
+
+
+def parse_ics_line(line_number, line):
+    # Quoted parameter values may contain ':' and ';', e.g. ORGANIZER;CN="Doe: John":mailto:...
+    head, *value = split_unquoted(line, ':', maxsplit=1)
+    value = value[0] if value else ''
+    name, *raw_params = split_unquoted(head, ';')
+    params = {}
+    for param in raw_params:
+        key, _, param_value = param.partition('=')
+        params[key.upper()] = param_value.strip('"')
+    return line_number, name.upper(), params, value
+
+
+def split_unquoted(text, separator, maxsplit=-1):
+    """Split `text` on `separator` outside double-quoted strings, at most `maxsplit` times."""
+    parts = []
+    start = 0
+    quoted = False
+
+    for index, char in enumerate(text):
+        if char == '"':
+            quoted = not quoted
+        elif char == separator and not quoted:
+            parts.append(text[start:index])
+            start = index + 1
+            if len(parts) == maxsplit:
+                break
+
+    parts.append(text[start:])
+    return parts
+
+
+def parse_ics_event(event):
+    if 'ORGANIZER' not in event or 'DTSTART' not in event:
+        raise ValueError("ORGANIZER and DTSTART are required.")
+
+    organizer_params, organizer = event['ORGANIZER']
+    start_time = parse_ics_datetime(*event['DTSTART'])
+    end_time = parse_ics_datetime(*event['DTEND']) if 'DTEND' in event else start_time + timedelta(hours=1)
+
+    if start_time > end_time:
+        raise ValueError("start time must be before end time.")
+
+    record = {
+        'owner_email': strip_mailto(organizer),
+        'owner_name': organizer_params.get('CN', ''),
+    }
+    check_email(record['owner_email'], 'ORGANIZER')
+
+    rrule = dict(part.partition('=')[::2] for part in event.get('RRULE', ({}, ''))[1].split(';') if part)
+
+    if rrule.get('FREQ', '').upper() == 'WEEKLY':
+        by_day = [day.strip()[-2:].upper() for day in rrule['BYDAY'].split(',')] if rrule.get('BYDAY') else []
+        days = [ICS_DAYS[day] for day in by_day if day in ICS_DAYS] or [start_time.strftime('%A')]
+
+        # Availability is stored in UTC, like appointments: a local window may fall on another UTC weekday.
+        utc_start = start_time.astimezone(dt_timezone.utc)
+        utc_end = end_time.astimezone(dt_timezone.utc)
+        if utc_start.date() != utc_end.date():
+            raise ValueError("weekly events must start and end on the same day in UTC.")
+
+        day_shift = (utc_start.date() - start_time.date()).days
+        week = list(ICS_DAYS.values())
+
+        for day_of_week in days:
+            yield dict(record, record='availability', day_of_week=week[(week.index(day_of_week) + day_shift) % 7],
+                       start_time=utc_start.time(), end_time=utc_end.time())
+        return
+
+    attendee_params, attendee = event.get('ATTENDEE', ({}, ''))
+    if attendee:
+        check_email(strip_mailto(attendee), 'ATTENDEE')
+
+    yield dict(
+        record,
+        record='appointment',
+        invitee_name=attendee_params.get('CN', ''),
+        invitee_email=strip_mailto(attendee),
+        start_time=start_time,
+        end_time=end_time,
+        agenda=event.get('DESCRIPTION', event.get('SUMMARY', ({}, '')))[1]
+    )
+
+
+def parse_ics_datetime(params, value):
+    if params.get('VALUE', '').upper() == 'DATE':
+        raise ValueError("all-day events are not supported.")
+
+    try:
+        if value.endswith('Z'):
+            return datetime.strptime(value, '%Y%m%dT%H%M%SZ').replace(tzinfo=dt_timezone.utc)
+        parsed = datetime.strptime(value, '%Y%m%dT%H%M%S')
+    except ValueError:
+        raise ValueError(f"'{value}' is not a valid iCalendar date-time.")
+
+    try:
+        tzinfo = ZoneInfo(params['TZID']) if 'TZID' in params else dt_timezone.utc
+    except ZoneInfoNotFoundError:
+        raise ValueError(f"Unknown TZID '{params['TZID']}'.")
+    return parsed.replace(tzinfo=tzinfo)
+
+
+def strip_mailto(value):
+    value = value.strip()
+    if value.lower().startswith('mailto:'):
+        value = value[len('mailto:'):]
+    return value.lower()
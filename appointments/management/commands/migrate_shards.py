@@ -0,0 +1,22 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from appointments.routers import shard_aliases
+
+
+class Command(BaseCommand):
+    help = """
+    Run `migrate` on every owner shard in settings.CALENDAR_SHARD_ALIASES. The appointments tables
+    are created on every shard; all other apps only on 'default'.
+    -----------------------------------------------------------------
+    Example:
+        CALENDAR_SHARDS=4 python manage.py migrate_shards
+    """
+
+    def handle(self, *args, **options):
+        for shard in shard_aliases():
+            self.stdout.write(f"Migrating shard '{shard}'")
+            call_command('migrate', database=shard, interactive=False, verbosity=options['verbosity'],
+                         stdout=self.stdout._out, stderr=self.stderr._out)
+
+        self.stdout.write(self.style.SUCCESS(f"Migrated {len(shard_aliases())} shards."))
@@ -0,0 +1,63 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from appointments.outbox import process_batch
+from appointments.routers import selected_shards
+
+
+class Command(BaseCommand):
+    help = """
+    Deliver booking events from the outbox to the endpoints in settings.OUTBOX_WEBHOOK_URLS.
+    Due events are fetched in batches and POSTed concurrently from a thread pool; failed
+    deliveries are retried with exponential backoff until settings.OUTBOX_MAX_ATTEMPTS.
+    Each round takes one batch from every shard. Run a single worker process per shard, or one
+    for all of them.
+    -----------------------------------------------------------------
+    Example:
+        python manage.py run_outbox_worker --threads 8 --batch-size 100
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4,
+                            help="Number of deliveries in flight at the same time.")
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help="Number of events fetched from the outbox per batch.")
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help="Seconds to wait when no events are due.")
+        parser.add_argument('--once', action='store_true',
+                            help="Exit once no more events are due instead of polling.")
+        parser.add_argument('--database',
+                            help="Only process this shard (database alias). Defaults to every shard.")
+
+    def handle(self, *args, **options):
+        if options['threads'] < 1 or options['batch_size'] < 1:
+            raise CommandError("--threads and --batch-size must be positive integers.")
+        if not settings.OUTBOX_WEBHOOK_URLS:
+            raise CommandError("No endpoints configured: set OUTBOX_WEBHOOK_URLS.")
+
+        try:
+            shards = selected_shards(options['database'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        processed = 0
+
+        with ThreadPoolExecutor(max_workers=options['threads']) as executor:
+            try:
+                while True:
+                    count = sum(process_batch(executor, options['batch_size'], using=shard) for shard in shards)
+                    processed += count
+
+                    if count:
+                        self.stdout.write(f"Processed {processed} events")
+                    elif options['once']:
+                        break
+                    else:
+                        time.sleep(options['poll_interval'])
+            except KeyboardInterrupt:
+                pass
+
+        self.stdout.write(self.style.SUCCESS(f"Outbox worker stopped after {processed} events."))
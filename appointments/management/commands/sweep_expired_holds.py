@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from appointments.models import SlotHold
+from appointments.routers import selected_shards
+
+
+class Command(BaseCommand):
+    help = """
+    Delete expired slot holds in batches. Expired holds are already ignored by search and booking,
+    so this only keeps the table small and can run on any schedule (e.g. every few minutes from cron).
+    -----------------------------------------------------------------
+    Example:
+        python manage.py sweep_expired_holds --batch-size 1000
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Number of holds deleted per transaction.")
+        parser.add_argument('--database',
+                            help="Only process this shard (database alias). Defaults to every shard.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be a positive integer.")
+
+        try:
+            shards = selected_shards(options['database'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        now = timezone.now()
+        deleted = 0
+        started = time.monotonic()
+
+        for shard in shards:
+            while True:
+                with transaction.atomic(using=shard):
+                    holds = SlotHold.objects.using(shard)
+                    ids = list(holds.filter(expires_at__lte=now).values_list('id', flat=True)[:batch_size])
+                    if not ids:
+                        break
+                    holds.filter(id__in=ids).delete()
+
+                deleted += len(ids)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired holds in {elapsed:.2f}s."))
@@ -0,0 +1,56 @@
+# Generated by Django 5.1.2 on 2026-10-19 07:38
+
+from django.db import migrations
+from django.db.models import Count
+
+# How many duplicated slots the error message lists before summarizing the rest.
+MAX_LISTED_DUPLICATES = 20
+
+
+def check_duplicate_appointments(apps, schema_editor):
+    """
+    Booking used to check that a slot was free and then insert without a lock, so concurrent
+    requests could book the same owner and start time twice. Those bookings belong to real
+    invitees, so instead of dropping any of them the migration stops and lists the duplicated
+    slots; cancel or reschedule the extra bookings and run `migrate` again.
+    """
+    Appointment = apps.get_model('appointments', 'Appointment')
+    duplicates = list(
+        Appointment.objects.using(schema_editor.connection.alias)
+        .values('calendar_owner__email', 'start_time')
+        .annotate(bookings=Count('id'))
+        .filter(bookings__gt=1)
+        .order_by('calendar_owner__email', 'start_time')
+    )
+    if not duplicates:
+        return
+
+    lines = [
+        f"  {duplicate['calendar_owner__email']} at {duplicate['start_time'].isoformat()}: "
+        f"{duplicate['bookings']} bookings"
+        for duplicate in duplicates[:MAX_LISTED_DUPLICATES]
+    ]
+    if len(duplicates) > MAX_LISTED_DUPLICATES:
+        lines.append(f"  ... and {len(duplicates) - MAX_LISTED_DUPLICATES} more slots")
+
+    raise RuntimeError(
+        f"Cannot make (calendar_owner, start_time) unique on database "
+        f"'{schema_editor.connection.alias}': {len(duplicates)} slots are booked more than once.\n"
+        + "\n".join(lines)
+        + "\nCancel or reschedule the extra bookings, then run migrate again."
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_appointments, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='appointment',
+            unique_together={('calendar_owner', 'start_time')},
+        ),
+    ]
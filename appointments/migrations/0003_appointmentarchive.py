@@ -0,0 +1,39 @@
+# Generated by Django 5.1.2 on 2026-10-19 07:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0002_appointment_unique_owner_start'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppointmentArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('invitee_name', models.CharField(max_length=100)),
+                ('invitee_email', models.EmailField(max_length=254)),
+                ('start_time', models.DateTimeField()),
+                ('end_time', models.DateTimeField()),
+                ('agenda', models.TextField(default='')),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['end_time'], name='appointment_end_tim_021f23_idx'),
+        ),
+        migrations.AddField(
+            model_name='appointmentarchive',
+            name='calendar_owner',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_appointments', to='appointments.calendarowner'),
+        ),
+        migrations.AddIndex(
+            model_name='appointmentarchive',
+            index=models.Index(fields=['calendar_owner', 'start_time'], name='appointment_calenda_e1dba0_idx'),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.1.2 on 2026-10-19 07:52
+
+from itertools import groupby
+
+from django.db import migrations
+
+
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def merge_time_slots(time_slots):
+    """
+    A copy of appointments.serializers.merge_time_slots as of this migration, so later changes
+    to the serializer do not change what the migration does. Overlapping slots are joined
+    instead of reported, and inverted or empty slots are dropped.
+    """
+    merged = []
+
+    for start_time, end_time in sorted(time_slots):
+        if start_time >= end_time:
+            continue
+
+        if merged and start_time <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end_time))
+        else:
+            merged.append((start_time, end_time))
+
+    return merged
+
+
+def capitalize_day_of_week(apps, schema_editor):
+    """
+    The availability setup endpoint used to store lower-case day names while slot search looks
+    them up as "Monday", "Tuesday", ... It also stored overlapping windows as they were sent,
+    which search never saw. Rewrite the stored names so both agree, and merge the windows of
+    every owner and day so the newly visible windows do not list a slot twice.
+    """
+    Availability = apps.get_model('appointments', 'Availability')
+    windows = Availability.objects.using(schema_editor.connection.alias)
+    days = {day.lower(): day for day in DAYS}
+
+    rows = windows.order_by('calendar_owner_id', 'id').iterator()
+    for owner_id, owner_rows in groupby(rows, key=lambda row: row.calendar_owner_id):
+        by_day = {}
+        for row in owner_rows:
+            day = days.get(row.day_of_week.lower())
+            if day is not None:
+                by_day.setdefault(day, []).append(row)
+
+        for day, day_rows in by_day.items():
+            stored = [(row.day_of_week, row.start_time, row.end_time) for row in day_rows]
+            merged = merge_time_slots([(row.start_time, row.end_time) for row in day_rows])
+            if sorted(stored) == [(day, start_time, end_time) for start_time, end_time in merged]:
+                continue
+
+            windows.filter(id__in=[row.id for row in day_rows]).delete()
+            windows.bulk_create([
+                Availability(calendar_owner_id=owner_id, day_of_week=day, start_time=start_time, end_time=end_time)
+                for start_time, end_time in merged
+            ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0003_appointmentarchive'),
+    ]
+
+    operations = [
+        migrations.RunPython(capitalize_day_of_week, migrations.RunPython.noop),
+    ]
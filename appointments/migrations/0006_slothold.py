@@ -0,0 +1,31 @@
+# Generated by Django 5.1.2 on 2026-10-19 07:50
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0005_outboxevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('invitee_email', models.EmailField(max_length=254)),
+                ('start_time', models.DateTimeField()),
+                ('end_time', models.DateTimeField()),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('calendar_owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holds', to='appointments.calendarowner')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['calendar_owner', 'start_time', 'expires_at'], name='appointment_calenda_2a0262_idx')],
+            },
+        ),
+    ]
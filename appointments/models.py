@@ -1,4 +1,7 @@
+import uuid
+
 from django.db import models
+from django.utils import timezone
 
 class CalendarOwner(models.Model):
     name = models.CharField(max_length=50)
@@ -31,5 +34,65 @@ class Appointment(models.Model):
     end_time = models.DateTimeField()
     agenda = models.TextField(default="")
 
+    class Meta:
+        unique_together = ('calendar_owner', 'start_time')
+        indexes = [models.Index(fields=['end_time'])]
+
     def __str__(self):
         return f"Appointment with {self.invitee_name} from {self.start_time} to {self.end_time}"
+
+class AppointmentArchive(models.Model):
+    # Keeps the primary key of the archived Appointment, so re-running an interrupted archive is a no-op.
+    id = models.BigIntegerField(primary_key=True)
+    calendar_owner = models.ForeignKey(CalendarOwner, on_delete=models.CASCADE, related_name='archived_appointments')
+    invitee_name = models.CharField(max_length=100)
+    invitee_email = models.EmailField()
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+    agenda = models.TextField(default="")
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['calendar_owner', 'start_time'])]
+
+    def __str__(self):
+        return f"Archived appointment with {self.invitee_name} from {self.start_time} to {self.end_time}"
+
+class SlotHold(models.Model):
+    calendar_owner = models.ForeignKey(CalendarOwner, on_delete=models.CASCADE, related_name='holds')
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    invitee_email = models.EmailField()
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+    # Expired holds are simply filtered out with `expires_at__gt=now` and deleted later in batches
+    # by `manage.py sweep_expired_holds`.
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['calendar_owner', 'start_time', 'expires_at'])]
+
+    def __str__(self):
+        return f"Hold for {self.invitee_email} from {self.start_time} to {self.end_time} until {self.expires_at}"
+
+class OutboxEvent(models.Model):
+    PENDING = 'pending'
+    DELIVERED = 'delivered'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(PENDING, 'Pending'), (DELIVERED, 'Delivered'), (FAILED, 'Failed')]
+
+    event_type = models.CharField(max_length=50)
+    payload = models.JSONField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'next_attempt_at'])]
+
+    def __str__(self):
+        return f"{self.event_type} #{self.pk} ({self.status})"
+
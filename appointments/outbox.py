@@ -0,0 +1,103 @@
+import json
+import urllib.request
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import OutboxEvent
+
+
+def enqueue_event(event_type, payload, using='default'):
+    """
+    Record an event for delivery by `manage.py run_outbox_worker`. Call this inside the same
+    transaction, and so on the same database, as the change it describes, so the event is stored
+    if and only if the change is.
+    """
+    return OutboxEvent.objects.using(using).create(event_type=event_type, payload=payload)
+
+
+def appointment_payload(appointment):
+    return {
+        'owner_email': appointment.calendar_owner.email,
+        'invitee_name': appointment.invitee_name,
+        'invitee_email': appointment.invitee_email,
+        'start_time': appointment.start_time.isoformat(),
+        'end_time': appointment.end_time.isoformat(),
+    }
+
+
+def deliver_event(event, endpoints, timeout):
+    """
+    POST an event to every endpoint. Raises on connection errors and non-2xx responses.
+    Runs in the worker's thread pool and must not touch the database.
+    """
+    body = json.dumps({
+        'id': event_id(event),
+        'event': event.event_type,
+        'created_at': event.created_at.isoformat(),
+        'data': event.payload,
+    }).encode()
+
+    for url in endpoints:
+        request = urllib.request.Request(url, data=body, method='POST', headers={
+            'Content-Type': 'application/json',
+            'X-Outbox-Event-Id': event_id(event),
+            'X-Outbox-Event-Type': event.event_type,
+        })
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+
+
+def event_id(event):
+    # Always a string, so receivers see one type. Every shard numbers its events from 1,
+    # so ids from other shards than 'default' carry the alias.
+    if event._state.db in (None, 'default'):
+        return str(event.id)
+    return f"{event._state.db}-{event.id}"
+
+
+def retry_delay(attempts):
+    """Exponential backoff in seconds after `attempts` failed deliveries."""
+    return min(settings.OUTBOX_RETRY_BACKOFF * 2 ** (attempts - 1), settings.OUTBOX_RETRY_BACKOFF_MAX)
+
+
+def process_batch(executor, batch_size, using='default'):
+    """
+    Deliver one batch of due events of the `using` database concurrently and record the outcome
+    of each with a single bulk update. Receivers may see an event more than once and should de-duplicate on its id.
+    Returns the number of events processed. Without endpoints nothing is fetched, so events stay
+    pending instead of being marked delivered.
+    """
+    if not settings.OUTBOX_WEBHOOK_URLS:
+        return 0
+
+    events = list(
+        OutboxEvent.objects.using(using).filter(status=OutboxEvent.PENDING, next_attempt_at__lte=timezone.now())
+        .order_by('id')[:batch_size]
+    )
+
+    futures = [
+        (event, executor.submit(deliver_event, event, settings.OUTBOX_WEBHOOK_URLS, settings.OUTBOX_WEBHOOK_TIMEOUT))
+        for event in events
+    ]
+
+    for event, future in futures:
+        event.attempts += 1
+        try:
+            future.result()
+        except Exception as e:
+            event.last_error = str(e)
+            if event.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                event.status = OutboxEvent.FAILED
+            else:
+                event.next_attempt_at = timezone.now() + timedelta(seconds=retry_delay(event.attempts))
+        else:
+            event.status = OutboxEvent.DELIVERED
+            event.delivered_at = timezone.now()
+            event.last_error = ""
+
+    OutboxEvent.objects.using(using).bulk_update(
+        events, ['status', 'attempts', 'next_attempt_at', 'last_error', 'delivered_at']
+    )
+    return len(events)
@@ -0,0 +1,94 @@
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections
+
+
+def shard_aliases():
+    return settings.CALENDAR_SHARD_ALIASES
+
+
+def shard_for_email(email):
+    """
+    The database alias holding a calendar owner and all of its rows. Uses a stable hash of the
+    lower-cased email, so every process maps an owner to the same shard.
+    """
+    aliases = shard_aliases()
+    if len(aliases) == 1:
+        return aliases[0]
+
+    digest = hashlib.blake2b(email.lower().encode(), digest_size=8).digest()
+    return aliases[int.from_bytes(digest, 'big') % len(aliases)]
+
+
+def selected_shards(database=None):
+    """The shards a management command should process: `database` if given, else all of them."""
+    if database is None:
+        return shard_aliases()
+    if database not in shard_aliases():
+        raise ValueError(f"Unknown shard '{database}'. Shards: {', '.join(shard_aliases())}.")
+    return [database]
+
+
+def run_on_shards(fn, aliases):
+    """
+    Call `fn(alias)` for every alias, concurrently when there is more than one, and return the
+    results in the same order. Each thread closes its own connections when done.
+    """
+    if len(aliases) == 1:
+        return [fn(aliases[0])]
+
+    def run(alias):
+        try:
+            return fn(alias)
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=len(aliases)) as executor:
+        return list(executor.map(run, aliases))
+
+
+class OwnerShardRouter:
+    """
+    Every table of the appointments app exists on every shard and holds the rows of the owners
+    hashed to that shard. Queries are pinned to a shard with `.using(shard_for_email(email))`;
+    this router places saved instances next to their owner and keeps other apps on 'default'.
+    """
+
+    def db_for_read(self, model, **hints):
+        return self.db_for_instance(hints.get('instance'))
+
+    def db_for_write(self, model, **hints):
+        return self.db_for_instance(hints.get('instance'))
+
+    def db_for_instance(self, instance):
+        if instance is None or instance._meta.app_label != 'appointments':
+            return None
+
+        if instance._meta.model_name == 'calendarowner':
+            return instance._state.db or shard_for_email(instance.email)
+
+        if instance._state.db:
+            return instance._state.db
+
+        try:
+            owner_field = instance._meta.get_field('calendar_owner')
+        except FieldDoesNotExist:
+            return None
+
+        if owner_field.is_cached(instance):
+            return self.db_for_instance(owner_field.get_cached_value(instance))
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if obj1._meta.app_label == 'appointments' or obj2._meta.app_label == 'appointments':
+            return obj1._state.db == obj2._state.db
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Every database in settings.DATABASES is a shard.
+        if app_label == 'appointments':
+            return True
+        return db == 'default'
@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import serializers
 from .models import CalendarOwner, Availability, Appointment
 
@@ -29,13 +30,55 @@ class AvailabilitySerializer(serializers.Serializer):
 
     def validate(self, attrs):
         valid_days = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-        
-        for day, _ in attrs.items():
+        errors = {}
+
+        for day, time_slots in attrs.items():
             if day.lower() not in valid_days:
                 raise serializers.ValidationError(f"{day} is not a valid day.")
+
+            attrs[day], day_errors = merge_time_slots(time_slots)
+            if day_errors:
+                errors[day] = day_errors
+
+        if errors:
+            raise serializers.ValidationError(errors)
         return attrs
 
 
+def merge_time_slots(time_slots):
+    """
+    Normalize the time slots of a single day. The slots are sorted once and scanned in a single
+    pass, so this is O(n log n): inverted and overlapping slots are reported as errors, empty
+    slots are dropped and adjacent slots are coalesced into one.
+    Returns the merged slots and the list of errors.
+    """
+    merged = []
+    errors = []
+
+    for time_slot in sorted(time_slots, key=lambda slot: (slot['start_time'], slot['end_time'])):
+        start_time, end_time = time_slot['start_time'], time_slot['end_time']
+
+        if start_time > end_time:
+            errors.append("Invalid time slot: start time must be before end time.")
+            continue
+
+        if start_time == end_time:
+            continue
+
+        if merged and start_time < merged[-1]['end_time']:
+            previous = merged[-1]
+            errors.append(
+                f"Time slot {start_time}-{end_time} overlaps {previous['start_time']}-{previous['end_time']}."
+            )
+            previous['end_time'] = max(previous['end_time'], end_time)
+        elif merged and start_time == merged[-1]['end_time']:
+            merged[-1]['end_time'] = end_time
+        else:
+            merged.append({'start_time': start_time, 'end_time': end_time})
+
+    return merged, errors
+
+
 class SearchAvailableSlotsSerializer(serializers.Serializer):
     owner_email = serializers.EmailField()
     date = serializers.DateField()
@@ -45,11 +88,53 @@ class BookAppointmentSerializer(serializers.Serializer):
     invitee_name = serializers.CharField(max_length=100)
     invitee_email = serializers.EmailField(max_length=254)
     start_time = serializers.DateTimeField()
+    hold_token = serializers.UUIDField(required=False)
+
+class HoldSlotSerializer(serializers.Serializer):
+    owner_email = serializers.EmailField()
+    invitee_email = serializers.EmailField(max_length=254)
+    start_time = serializers.DateTimeField()
+    minutes = serializers.IntegerField(min_value=1, required=False)
+
+    def validate_minutes(self, value):
+        if value > settings.SLOT_HOLD_MAX_MINUTES:
+            raise serializers.ValidationError(f"A slot can be held for at most {settings.SLOT_HOLD_MAX_MINUTES} minutes.")
+        return value
+
+class CancelAppointmentSerializer(serializers.Serializer):
+    owner_email = serializers.EmailField()
+    start_time = serializers.DateTimeField()
+
+class RescheduleAppointmentSerializer(CancelAppointmentSerializer):
+    new_start_time = serializers.DateTimeField()
 
 
 class UpcomingAppointmentsSerializer(serializers.Serializer):
     owner_email = serializers.EmailField()
 
+class AppointmentHistorySerializer(serializers.Serializer):
+    owner_email = serializers.EmailField()
+    include_archived = serializers.BooleanField(default=False)
+
+class AppointmentHistoryEntrySerializer(serializers.Serializer):
+    invitee_name = serializers.CharField()
+    invitee_email = serializers.EmailField()
+    start_time = serializers.DateTimeField()
+    end_time = serializers.DateTimeField()
+    archived = serializers.BooleanField()
+
+class OwnerUtilizationSerializer(serializers.Serializer):
+    owner_email = serializers.ListField(child=serializers.EmailField(), required=False)
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+
+    def validate(self, attrs):
+        if attrs['end_date'] < attrs['start_date']:
+            raise serializers.ValidationError("end_date must not be before start_date.")
+        if (attrs['end_date'] - attrs['start_date']).days >= 366:
+            raise serializers.ValidationError("The date range cannot be longer than 366 days.")
+        return attrs
+
 class AppointmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Appointment
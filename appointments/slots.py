@@ -0,0 +1,269 @@
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import DateTimeField, Value
+from django.utils import timezone as django_timezone
+
+from .models import Availability, Appointment, SlotHold
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key: the first caller runs the function and every
+    caller arriving while it runs waits for and shares its result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {'done': threading.Event(), 'result': None, 'error': None}
+
+        if not leader:
+            call['done'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            return call['result']
+
+        try:
+            call['result'] = fn()
+            return call['result']
+        except Exception as e:
+            call['error'] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call['done'].set()
+
+
+flights = SingleFlight()
+
+
+def compute_available_slots(calendar_owner, date, hold_token=None):
+    """
+    Compute the free one-hour slots of a calendar owner on a date, straight from the database.
+    Active holds count as busy, except the hold identified by `hold_token`.
+    """
+    return compute_slots_with_expiry(calendar_owner, date, hold_token)[0]
+
+
+def compute_slots_with_expiry(calendar_owner, date, hold_token=None):
+    """
+    Like `compute_available_slots`, and also return the earliest expiry of the active holds
+    on that date (or None), after which the result is out of date.
+    """
+    db = calendar_owner._state.db
+    windows = Availability.objects.using(db).filter(
+        calendar_owner=calendar_owner,
+        day_of_week=date.strftime("%A")
+    ).order_by('start_time').values_list('start_time', 'end_time')
+
+    day_start = datetime.combine(date, datetime.min.time(), tzinfo=timezone.utc)
+    day_end = day_start + timedelta(days=1)
+
+    appointment_starts = Appointment.objects.using(db).filter(
+        calendar_owner=calendar_owner,
+        start_time__gte=day_start,
+        start_time__lt=day_end
+    ).values_list('start_time', Value(None, output_field=DateTimeField()))
+
+    hold_starts = SlotHold.objects.using(db).filter(
+        calendar_owner=calendar_owner,
+        start_time__gte=day_start,
+        start_time__lt=day_end,
+        expires_at__gt=django_timezone.now()
+    )
+    if hold_token is not None:
+        hold_starts = hold_starts.exclude(token=hold_token)
+
+    booked_starts = set()
+    holds_expire_at = None
+
+    for start_time, expires_at in appointment_starts.union(hold_starts.values_list('start_time', 'expires_at'), all=True):
+        booked_starts.add(start_time.replace(tzinfo=None))
+        if expires_at is not None and (holds_expire_at is None or expires_at < holds_expire_at):
+            holds_expire_at = expires_at
+
+    return generate_slots(date, windows, booked_starts), holds_expire_at
+
+
+HOUR_US = 3600 * 1000000
+
+# Seconds a patch may hold a date's lock before it expires (e.g. if its worker dies).
+PATCH_LOCK_TIMEOUT = 5
+# Seconds a date's write counter is kept; far longer than any slot computation.
+WRITES_TIMEOUT = 300
+
+
+def generate_slots(date, windows, booked_starts):
+    """
+    Split each (start_time, end_time) availability window into one-hour slots, skipping slots
+    whose start is in `booked_starts` (naive UTC datetimes).
+    Walks each window in integer microseconds of the day and formats the slot strings directly,
+    instead of doing datetime arithmetic and strftime for every slot. Must return exactly what
+    `reference_slots` returns for the same input.
+    """
+    prefix = date.strftime("%Y-%m-%dT")
+    booked = {
+        ((start.hour * 60 + start.minute) * 60 + start.second) * 1000000 + start.microsecond
+        for start in booked_starts
+        if start.date() == date
+    }
+    available_slots = []
+
+    for window_start, window_end in windows:
+        start = ((window_start.hour * 60 + window_start.minute) * 60 + window_start.second) * 1000000 + window_start.microsecond
+        end = ((window_end.hour * 60 + window_end.minute) * 60 + window_end.second) * 1000000 + window_end.microsecond
+
+        for slot_start in range(start, end - HOUR_US + 1, HOUR_US):
+            if slot_start not in booked:
+                minutes, seconds = divmod(slot_start // 1000000, 60)
+                hours, minutes = divmod(minutes, 60)
+                available_slots.append({
+                    'start_time': f"{prefix}{hours:02d}:{minutes:02d}:{seconds:02d}",
+                    'end_time': f"{prefix}{hours + 1:02d}:{minutes:02d}:{seconds:02d}"
+                })
+
+    return available_slots
+
+
+def reference_slots(date, windows, booked_starts):
+    """
+    The original slot loop, kept as the oracle that `generate_slots` is tested against.
+    Not used to serve requests.
+    """
+    available_slots = []
+
+    for window_start, window_end in windows:
+        start_time = datetime.combine(date, window_start)
+        end_time = datetime.combine(date, window_end)
+
+        while start_time + timedelta(hours=1) <= end_time:
+            if start_time not in booked_starts:
+                available_slots.append({
+                    'start_time': start_time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    'end_time': (start_time + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%S")
+                })
+            start_time += timedelta(hours=1)
+
+    return available_slots
+
+
+def owner_cache_id(calendar_owner):
+    # Owner ids are only unique within a shard.
+    return f"{calendar_owner._state.db}:{calendar_owner.id}"
+
+
+def slots_cache_key(calendar_owner, date):
+    # The per-owner version is replaced whenever the owner's availability changes, which
+    # orphans every cached date of that owner at once.
+    owner_id = owner_cache_id(calendar_owner)
+    version = cache.get_or_set(f"available-slots-version:{owner_id}", uuid.uuid4().hex, None)
+    return f"available-slots:{owner_id}:{version}:{date.isoformat()}"
+
+
+def get_available_slots(calendar_owner, date):
+    """
+    Return the free slots of a calendar owner on a date from a short-lived cache. On a miss,
+    concurrent identical searches in this process share a single computation. Bookings, holds and
+    cancellations patch cached dates through `update_cached_slots`.
+    """
+    key = slots_cache_key(calendar_owner, date)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached[0]
+
+    def compute():
+        cached = cache.get(key)
+        if cached is None:
+            writes = cache.get(f"{key}:writes")
+            cached = compute_slots_with_expiry(calendar_owner, date)
+            # A booking that committed while we read the database may already be missing from
+            # the result, so only cache it if no write to this date was recorded meanwhile.
+            if cache.get(f"{key}:writes") == writes:
+                cache_slots(key, *cached)
+        return cached[0]
+
+    return flights.do(key, compute)
+
+
+def cache_slots(key, available_slots, holds_expire_at):
+    # A held slot becomes free again when its hold expires, so never cache past the earliest expiry.
+    timeout = settings.SEARCH_SLOTS_CACHE_TTL
+    if holds_expire_at is not None:
+        timeout = min(timeout, (holds_expire_at - django_timezone.now()).total_seconds())
+    if timeout > 0:
+        cache.set(key, (available_slots, holds_expire_at), timeout)
+
+
+def update_cached_slots(calendar_owner, date, booked=(), freed=(), held_until=None):
+    """
+    Patch the cached slots of one date instead of recomputing them: slots starting at a `booked`
+    time are removed, and slots starting at a `freed` time are added back if they are still part of
+    the owner's weekly availability. Pass `held_until` when the booked slots are only held until
+    then. Dates that are not cached are left alone.
+    Every call is counted under the date's key so that searches computed concurrently are not
+    cached, and concurrent patches of one date take a lock; when it is taken, the date is dropped
+    from the cache instead of risking a lost update.
+    """
+    key = slots_cache_key(calendar_owner, date)
+    record_write(f"{key}:writes")
+
+    if not cache.add(f"{key}:lock", 1, PATCH_LOCK_TIMEOUT):
+        cache.delete(key)
+        return
+
+    try:
+        patch_cached_slots(calendar_owner, date, key, booked, freed, held_until)
+    finally:
+        cache.delete(f"{key}:lock")
+
+
+def patch_cached_slots(calendar_owner, date, key, booked, freed, held_until):
+    cached = cache.get(key)
+    if cached is None:
+        return
+
+    available_slots, holds_expire_at = cached
+    if held_until is not None and (holds_expire_at is None or held_until < holds_expire_at):
+        holds_expire_at = held_until
+
+    booked_starts = {start_time.strftime("%Y-%m-%dT%H:%M:%S") for start_time in booked}
+    available_slots = [slot for slot in available_slots if slot['start_time'] not in booked_starts]
+
+    if freed:
+        windows = Availability.objects.using(calendar_owner._state.db).filter(
+            calendar_owner=calendar_owner,
+            day_of_week=date.strftime("%A")
+        ).values_list('start_time', 'end_time')
+        template = {slot['start_time']: slot for slot in generate_slots(date, windows, set())}
+        listed = {slot['start_time'] for slot in available_slots}
+
+        for start_time in freed:
+            start = start_time.strftime("%Y-%m-%dT%H:%M:%S")
+            if start in template and start not in listed:
+                available_slots.append(template[start])
+        available_slots.sort(key=lambda slot: slot['start_time'])
+
+    cache_slots(key, available_slots, holds_expire_at)
+
+
+def record_write(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, WRITES_TIMEOUT):
+            cache.incr(key)
+
+
+def invalidate_owner_slots(calendar_owner):
+    cache.set(f"available-slots-version:{owner_cache_id(calendar_owner)}", uuid.uuid4().hex, None)
@@ -1,9 +1,35 @@
-from django.test import TestCase
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import timeit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from importlib import import_module
+from io import StringIO
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock, skipIf, skipUnless
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connections
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from calender.schema import get_view
+from hypothesis import Phase, given, settings as hypothesis_settings, strategies as st
 from rest_framework import status
 from rest_framework.test import APIClient
 from django.urls import reverse
-from datetime import datetime, timedelta
-from .models import CalendarOwner, Availability, Appointment
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from .models import CalendarOwner, Availability, Appointment, AppointmentArchive, OutboxEvent, SlotHold
+from .outbox import process_batch
+from .routers import OwnerShardRouter, run_on_shards, selected_shards, shard_for_email
+from .slots import generate_slots, get_available_slots, reference_slots, slots_cache_key, update_cached_slots
+from .throttling import CacheTokenBucketBackend
 
 
 def get_next_monday():
@@ -14,10 +40,76 @@ def get_next_monday():
     return datetime.combine(next_monday, datetime.min.time()) 
 
 
+class StubWebhookServer:
+    """Local HTTP server recording webhook deliveries, answering with `response_status` after `delay` seconds."""
+
+    def __init__(self, response_status=200, delay=0):
+        received = self.received = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                received.append(json.loads(self.rfile.read(int(self.headers['Content-Length']))))
+                time.sleep(delay)
+                self.send_response(response_status)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/hooks"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class MondayCalendarTestCase(TestCase):
+    """Shared fixture: one calendar owner available on Mondays from 09:00 to `availability_end`."""
+    availability_end = '12:00:00'
+
+    def setUp(self):
+        """Set up a calendar owner with availability on Mondays and an empty cache."""
+        cache.clear()
+        self.client = APIClient()
+        self.calendar_owner = CalendarOwner.objects.create(name="Himanshu", email="himanshu.anuragi@mail.com")
+        Availability.objects.create(
+            calendar_owner=self.calendar_owner, day_of_week='Monday',
+            start_time='09:00:00', end_time=self.availability_end
+        )
+        self.date = (get_next_monday() + timedelta(days=7)).date()
+        self.start_time = datetime.combine(self.date, datetime.min.time(), tzinfo=timezone.utc) + timedelta(hours=9)
+
+    def search_response(self):
+        """Helper function to search the slots of the calendar owner on `self.date`."""
+        return self.client.get(reverse('search-available-slots'), {
+            'owner_email': self.calendar_owner.email, 'date': self.date.strftime('%Y-%m-%d')
+        })
+
+    def search(self):
+        """Helper function to return the start times of the free slots of the calendar owner."""
+        return [slot['start_time'][11:16] for slot in self.search_response().data]
+
+    def book(self, hour=9, **extra):
+        """Helper function to book a slot of the calendar owner on `self.date`."""
+        return self.client.post(reverse('book-appointment'), {
+            "owner_email": self.calendar_owner.email,
+            "invitee_name": "Invitee",
+            "invitee_email": "invitee@mail.com",
+            "start_time": self.start_time.replace(hour=hour).strftime("%Y-%m-%dT%H:%M:%S"),
+            **extra
+        }, format='json')
+
+
 class CalendarAPIUnitTests(TestCase):
     
     def setUp(self):
         """Set up test data for calendar owner before running the tests."""
+        cache.clear()
         self.client = APIClient()
         self.calendar_owner_data = {
             "owner_name": "Himanshu",
@@ -102,6 +194,64 @@ class CalendarAPIUnitTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(Availability.objects.count(), 0)
 
+    def test_create_availability_overlapping_slots_fail(self):
+        """Test creating availability with overlapping or duplicate time slots on a day."""
+        data = self.get_availability_data()
+        data["availability"]["Monday"] = [
+            {"start_time": "09:00:00", "end_time": "12:00:00"},
+            {"start_time": "11:00:00", "end_time": "13:00:00"},
+            {"start_time": "09:00:00", "end_time": "12:00:00"}
+        ]
+        url = reverse('availability-setup')
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(response.data["errors"]["monday"]), 2)
+        self.assertEqual(Availability.objects.count(), 0)
+
+    def test_create_availability_merges_adjacent_slots(self):
+        """Test adjacent time slots are coalesced into one stored availability."""
+        data = self.get_availability_data()
+        data["availability"]["Monday"] = [
+            {"start_time": "13:00:00", "end_time": "15:00:00"},
+            {"start_time": "09:00:00", "end_time": "11:00:00"},
+            {"start_time": "11:00:00", "end_time": "13:00:00"}
+        ]
+        url = reverse('availability-setup')
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        monday = Availability.objects.get(day_of_week='Monday')
+        self.assertEqual((str(monday.start_time), str(monday.end_time)), ('09:00:00', '15:00:00'))
+
+        response = self.client.get(reverse('search-available-slots'), {
+            'owner_email': self.calendar_owner.email,
+            'date': get_next_monday().strftime('%Y-%m-%d')
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 6)
+
+    def test_legacy_availability_migration_merges_overlaps(self):
+        """Test migration 0004 capitalizes legacy day names and merges their overlapping windows."""
+        self.create_availability('monday', '09:00:00', '12:00:00')
+        self.create_availability('monday', '10:00:00', '13:00:00')
+        self.create_availability('Monday', '13:00:00', '14:00:00')
+        self.create_availability('tuesday', '09:00:00', '10:00:00')
+
+        migration = import_module('appointments.migrations.0004_capitalize_day_of_week')
+        migration.capitalize_day_of_week(django_apps, SimpleNamespace(connection=connections['default']))
+
+        self.assertEqual(
+            sorted(Availability.objects.values_list('day_of_week', 'start_time', 'end_time')),
+            [('Monday', dt_time(9), dt_time(14)), ('Tuesday', dt_time(9), dt_time(10))]
+        )
+
+        response = self.client.get(reverse('search-available-slots'), {
+            'owner_email': self.calendar_owner.email,
+            'date': (get_next_monday() + timedelta(days=7)).strftime('%Y-%m-%d')
+        })
+        self.assertEqual([slot['start_time'][11:16] for slot in response.data],
+                         ['09:00', '10:00', '11:00', '12:00', '13:00'])
+
     def test_search_available_slots(self):
         """Test searching for available time slots."""
         self.create_availability('Monday', '09:00:00', '12:00:00')
@@ -270,4 +420,832 @@ class CalendarAPIUnitTests(TestCase):
     def tearDown(self):
         """Clean up test data after tests run."""
         Appointment.objects.all().delete()
-        Availability.objects.all().delete()
\ No newline at end of file
+        Availability.objects.all().delete()
+
+
+class ImportCalendarCommandTests(TestCase):
+
+    def run_import(self, content, suffix):
+        """Helper function to write `content` to a temporary file, import it and return its stdout and stderr."""
+        with tempfile.NamedTemporaryFile('w', suffix=suffix, delete=False) as source:
+            source.write(content)
+        self.addCleanup(os.remove, source.name)
+
+        output = StringIO()
+        call_command('import_calendar', source.name, '--batch-size', '2', stdout=output, stderr=output)
+        return output.getvalue()
+
+    def test_import_csv(self):
+        """Test importing owners, availability and appointments from a CSV file."""
+        output = self.run_import(
+            "record,owner_email,owner_name,day_of_week,start_time,end_time,invitee_name,invitee_email,agenda\n"
+            "availability,Owner@mail.com,Owner,monday,09:00:00,12:00:00,,,\n"
+            "availability,owner@mail.com,,Wednesday,10:00:00,12:00:00,,,\n"
+            "appointment,owner@mail.com,,,2030-01-07T09:00:00Z,,Invitee,invitee@mail.com,Intro\n",
+            '.csv'
+        )
+
+        owner = CalendarOwner.objects.get(email='owner@mail.com')
+        self.assertEqual(owner.name, 'Owner')
+        self.assertEqual(Availability.objects.filter(calendar_owner=owner, day_of_week='Monday').count(), 1)
+        self.assertEqual(Availability.objects.filter(calendar_owner=owner).count(), 2)
+
+        appointment = Appointment.objects.get(calendar_owner=owner)
+        self.assertEqual(appointment.end_time, datetime(2030, 1, 7, 10, 0, tzinfo=timezone.utc))
+        self.assertEqual(appointment.agenda, 'Intro')
+        self.assertIn('Import finished: 3 rows from 1 owners', output)
+
+    def test_import_csv_upserts_existing_rows(self):
+        """Test re-importing a file updates appointments instead of duplicating them."""
+        header = "record,owner_email,owner_name,day_of_week,start_time,end_time,invitee_name,invitee_email,agenda\n"
+        self.run_import(header + "appointment,owner@mail.com,Owner,,2030-01-07T09:00:00Z,,Invitee,invitee@mail.com,Intro\n", '.csv')
+        self.run_import(header + "appointment,owner@mail.com,Renamed,,2030-01-07T09:00:00Z,,Invitee,invitee@mail.com,Follow-up\n", '.csv')
+
+        self.assertEqual(CalendarOwner.objects.get().name, 'Renamed')
+        self.assertEqual(Appointment.objects.get().agenda, 'Follow-up')
+
+    def test_import_csv_merges_availability(self):
+        """Test imported windows are merged with stored ones, so duplicates and overlaps never repeat slots."""
+        header = "record,owner_email,owner_name,day_of_week,start_time,end_time,invitee_name,invitee_email,agenda\n"
+        rows = (
+            "availability,owner@mail.com,Owner,monday,09:00:00,10:00:00,,,\n"
+            "availability,owner@mail.com,Owner,monday,09:00:00,10:00:00,,,\n"
+            "availability,owner@mail.com,Owner,monday,10:00:00,11:00:00,,,\n"
+        )
+        self.run_import(header + rows, '.csv')
+        self.run_import(header + rows + "availability,owner@mail.com,,monday,11:00:00,12:00:00,,,\n", '.csv')
+
+        self.assertEqual(
+            list(Availability.objects.values_list('day_of_week', 'start_time', 'end_time')),
+            [('Monday', dt_time(9, 0), dt_time(12, 0))]
+        )
+
+        self.run_import(header + "availability,owner@mail.com,,monday,10:30:00,13:00:00,,,\n", '.csv')
+        self.assertEqual(
+            list(Availability.objects.values_list('start_time', 'end_time')),
+            [(dt_time(9, 0), dt_time(13, 0))]
+        )
+
+    def test_import_ics(self):
+        """Test importing weekly availability and appointments from an iCalendar file."""
+        self.run_import(
+            "BEGIN:VCALENDAR\r\n"
+            "BEGIN:VEVENT\r\n"
+            "ORGANIZER;CN=Owner:mailto:owner@mail.com\r\n"
+            "DTSTART:20300107T090000Z\r\n"
+            "DTEND:20300107T120000Z\r\n"
+            "RRULE:FREQ=WEEKLY;BYDAY=MO,WE\r\n"
+            "END:VEVENT\r\n"
+            "BEGIN:VEVENT\r\n"
+            "ORGANIZER;CN=Owner:mailto:owner@mail.com\r\n"
+            "ATTENDEE;CN=Invitee:mailto:invitee@\r\n"
+            " mail.com\r\n"
+            "DTSTART:20300107T100000Z\r\n"
+            "DTEND:20300107T110000Z\r\n"
+            "SUMMARY:Intro\r\n"
+            "END:VEVENT\r\n"
+            "END:VCALENDAR\r\n",
+            '.ics'
+        )
+
+        owner = CalendarOwner.objects.get(email='owner@mail.com')
+        self.assertEqual(
+            sorted(Availability.objects.filter(calendar_owner=owner).values_list('day_of_week', flat=True)),
+            ['Monday', 'Wednesday']
+        )
+        appointment = Appointment.objects.get(calendar_owner=owner)
+        self.assertEqual(appointment.invitee_email, 'invitee@mail.com')
+        self.assertEqual(appointment.agenda, 'Intro')
+
+
+    def test_import_ics_converts_weekly_windows_to_utc(self):
+        """Test weekly events with a TZID become UTC availability, on the UTC weekday."""
+        event = (
+            "BEGIN:VCALENDAR\r\n"
+            "BEGIN:VEVENT\r\n"
+            "ORGANIZER;CN=Owner:mailto:owner@mail.com\r\n"
+            "DTSTART;TZID=America/New_York:20300111T{start}00\r\n"
+            "DTEND;TZID=America/New_York:20300111T{end}00\r\n"
+            "RRULE:FREQ=WEEKLY;BYDAY=FR\r\n"
+            "END:VEVENT\r\n"
+            "END:VCALENDAR\r\n"
+        )
+        self.run_import(event.format(start='2000', end='2200'), '.ics')
+
+        availability = Availability.objects.get()
+        self.assertEqual(
+            (availability.day_of_week, availability.start_time, availability.end_time),
+            ('Saturday', dt_time(1, 0), dt_time(3, 0))
+        )
+
+        output = self.run_import(event.format(start='1800', end='2000'), '.ics')
+        self.assertIn("Skipped event ending on line 7: weekly events must start and end on the same day in UTC.", output)
+        self.assertEqual(Availability.objects.count(), 1)
+
+    def test_import_csv_skips_invalid_rows(self):
+        """Test invalid rows are reported and skipped while the valid rows around them are imported."""
+        output = self.run_import(
+            "record,owner_email,owner_name,day_of_week,start_time,end_time,invitee_name,invitee_email,agenda\n"
+            "appointment,owner@mail.com,Owner,,2030-01-07T09:00:00Z,,Invitee,invitee@mail.com,\n"
+            "appointment,not-an-email,Owner,,2030-01-07T10:00:00Z,,Invitee,invitee@mail.com,\n"
+            "appointment,owner@mail.com,Owner,,2030-01-07T11:00:00Z,,Invitee,invitee@,\n"
+            "appointment,owner@mail.com,Owner,,tomorrow,,Invitee,invitee@mail.com,\n"
+            "availability,owner@mail.com,Owner,monday,09:00:00,12:00:00,,,\n",
+            '.csv'
+        )
+
+        self.assertIn("Skipped line 3: 'not-an-email' is not a valid owner_email.", output)
+        self.assertIn("Skipped line 4: 'invitee@' is not a valid invitee_email.", output)
+        self.assertIn("Skipped line 5:", output)
+        self.assertIn("Skipped 3 invalid rows or events.", output)
+        self.assertEqual(list(CalendarOwner.objects.values_list('email', flat=True)), ['owner@mail.com'])
+        self.assertEqual(Appointment.objects.get().start_time.hour, 9)
+        self.assertEqual(Availability.objects.count(), 1)
+
+    def test_import_ics_skips_all_day_events_and_keeps_quoted_colons(self):
+        """Test all-day events are skipped, and quoted parameter values may contain colons."""
+        output = self.run_import(
+            "BEGIN:VCALENDAR\r\n"
+            "BEGIN:VEVENT\r\n"
+            "ORGANIZER;CN=\"Doe: John\":mailto:owner@mail.com\r\n"
+            "DTSTART;VALUE=DATE:20300107\r\n"
+            "END:VEVENT\r\n"
+            "BEGIN:VEVENT\r\n"
+            "ORGANIZER;CN=\"Doe: John\":mailto:owner@mail.com\r\n"
+            "ATTENDEE;CN=\"Roe; Jane\";ROLE=REQ-PARTICIPANT:mailto:invitee@mail.com\r\n"
+            "DTSTART:20300107T100000Z\r\n"
+            "END:VEVENT\r\n"
+            "END:VCALENDAR\r\n",
+            '.ics'
+        )
+
+        self.assertIn("Skipped event ending on line 5: all-day events are not supported.", output)
+        appointment = Appointment.objects.get()
+        self.assertEqual(appointment.calendar_owner.name, 'Doe: John')
+        self.assertEqual((appointment.invitee_name, appointment.invitee_email), ('Roe; Jane', 'invitee@mail.com'))
+
+class ArchiveAppointmentsTests(TestCase):
+
+    def setUp(self):
+        """Set up a calendar owner with one past and one upcoming appointment."""
+        self.client = APIClient()
+        self.calendar_owner = CalendarOwner.objects.create(name="Himanshu", email="himanshu.anuragi@mail.com")
+        self.past_start = datetime(2023, 10, 16, 9, 0, tzinfo=timezone.utc)
+        self.upcoming_start = get_next_monday().replace(tzinfo=timezone.utc) + timedelta(days=7, hours=9)
+
+        for invitee_name, start_time in (("Past", self.past_start), ("Upcoming", self.upcoming_start)):
+            Appointment.objects.create(
+                calendar_owner=self.calendar_owner,
+                invitee_name=invitee_name,
+                invitee_email="invitee@mail.com",
+                start_time=start_time,
+                end_time=start_time + timedelta(hours=1)
+            )
+
+    def test_archive_moves_past_appointments(self):
+        """Test archiving moves only appointments before the cutoff and can safely be re-run."""
+        call_command('archive_appointments', '--before', '2024-01-01', '--batch-size', '1', stdout=StringIO())
+        call_command('archive_appointments', '--before', '2024-01-01', stdout=StringIO())
+
+        self.assertEqual(list(Appointment.objects.values_list('invitee_name', flat=True)), ["Upcoming"])
+        archived = AppointmentArchive.objects.get()
+        self.assertEqual(archived.invitee_name, "Past")
+        self.assertEqual(archived.start_time, self.past_start)
+
+    def test_archive_rejects_future_cutoff(self):
+        """Test upcoming appointments can never be archived, as bookings only check the live table."""
+        with self.assertRaises(CommandError):
+            call_command('archive_appointments', '--before', '2100-01-01', stdout=StringIO())
+
+        self.assertEqual(Appointment.objects.count(), 2)
+        self.assertFalse(AppointmentArchive.objects.exists())
+
+    def test_history_includes_archived_only_when_asked(self):
+        """Test the history endpoint unions the archive only with include_archived=true."""
+        call_command('archive_appointments', '--before', '2024-01-01', stdout=StringIO())
+        url = reverse('appointment-history')
+
+        response = self.client.get(url, {'owner_email': self.calendar_owner.email})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([entry['invitee_name'] for entry in response.data], ["Upcoming"])
+
+        response = self.client.get(url, {'owner_email': self.calendar_owner.email, 'include_archived': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(entry['invitee_name'], entry['archived']) for entry in response.data],
+            [("Past", True), ("Upcoming", False)]
+        )
+
+
+class OutboxTests(MondayCalendarTestCase):
+
+    def test_booking_enqueues_event_without_delivering(self):
+        """Test booking writes an outbox event and never waits on a slow receiver."""
+        with StubWebhookServer(delay=2) as server, override_settings(OUTBOX_WEBHOOK_URLS=[server.url]):
+            started = time.monotonic()
+            response = self.book()
+            elapsed = time.monotonic() - started
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertLess(elapsed, 1)
+        self.assertEqual(server.received, [])
+
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.event_type, 'appointment.booked')
+        self.assertEqual(event.status, OutboxEvent.PENDING)
+        self.assertEqual(event.payload['owner_email'], self.calendar_owner.email)
+
+    def test_worker_delivers_events(self):
+        """Test the outbox worker POSTs pending events and marks them delivered."""
+        self.book()
+        event = OutboxEvent.objects.get()
+
+        with StubWebhookServer() as server, override_settings(OUTBOX_WEBHOOK_URLS=[server.url]):
+            call_command('run_outbox_worker', '--once', stdout=StringIO())
+
+        self.assertEqual([(body['id'], body['event']) for body in server.received], [(str(event.id), 'appointment.booked')])
+        event.refresh_from_db()
+        self.assertEqual(event.status, OutboxEvent.DELIVERED)
+        self.assertEqual(event.attempts, 1)
+
+    def test_worker_retries_failed_deliveries_with_backoff(self):
+        """Test a failed delivery stays pending and is scheduled for a later retry."""
+        self.book()
+
+        with StubWebhookServer(response_status=500) as server, override_settings(OUTBOX_WEBHOOK_URLS=[server.url]):
+            call_command('run_outbox_worker', '--once', stdout=StringIO())
+            call_command('run_outbox_worker', '--once', stdout=StringIO())
+
+        self.assertEqual(len(server.received), 1)
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.status, OutboxEvent.PENDING)
+        self.assertEqual(event.attempts, 1)
+        self.assertIn('500', event.last_error)
+        self.assertGreater(event.next_attempt_at, datetime.now(timezone.utc))
+
+
+    @override_settings(OUTBOX_WEBHOOK_URLS=[])
+    def test_worker_requires_endpoints(self):
+        """Test the worker refuses to start without endpoints and events are never marked delivered."""
+        self.book()
+
+        with self.assertRaises(CommandError):
+            call_command('run_outbox_worker', '--once', stdout=StringIO())
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            self.assertEqual(process_batch(executor, 10), 0)
+        self.assertEqual(OutboxEvent.objects.get().status, OutboxEvent.PENDING)
+
+class WorkerStartupTests(TestCase):
+    # Boots per settings module; the cheapest boot of each is compared, which filters out noise
+    # from other processes on the machine.
+    BOOTS = 3
+
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    BOOT_SCRIPT = (
+        "import resource, sys\n"
+        "from calender.wsgi import application\n"
+        "from django.urls import get_resolver\n"
+        "get_resolver().url_patterns\n"
+        "rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+        "print(rss // 1024 if sys.platform == 'darwin' else rss)\n"
+        "print(','.join(sys.modules))\n"
+    )
+
+    def boot_worker(self, settings_module):
+        """Helper function to boot a WSGI worker in a subprocess and return its import time (us), RSS (KB) and modules."""
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', self.BOOT_SCRIPT],
+            cwd=settings.BASE_DIR,
+            env=dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module),
+            capture_output=True,
+            text=True,
+            timeout=60,
+            check=True
+        )
+
+        import_time_us = sum(
+            int(line.split('|')[0].split(':')[1])
+            for line in result.stderr.splitlines()
+            if line.startswith('import time:') and 'self [us]' not in line
+        )
+        rss_kb, modules = result.stdout.splitlines()
+        return import_time_us, int(rss_kb), modules.split(',')
+
+    def cheapest_boot(self, settings_module):
+        """Helper function to boot a worker `BOOTS` times and return the lowest import time and RSS, and its modules."""
+        boots = [self.boot_worker(settings_module) for _ in range(self.BOOTS)]
+        return min(boot[0] for boot in boots), min(boot[1] for boot in boots), boots[0][2]
+
+    @skipIf(sys.platform == 'win32', "The resource module is not available on Windows.")
+    def test_production_worker_boots_cheaper_than_development(self):
+        """Test a production worker boots without the docs, faster and in no more memory than a development one."""
+        import_time_us, rss_kb, modules = self.cheapest_boot('calender.settings_production')
+        dev_import_time_us, dev_rss_kb, dev_modules = self.cheapest_boot('calender.settings')
+
+        self.assertNotIn('drf_yasg', modules)
+        self.assertIn('drf_yasg', dev_modules)
+        self.assertLess(len(modules), len(dev_modules))
+        self.assertLess(import_time_us, dev_import_time_us)
+        self.assertLessEqual(rss_kb, dev_rss_kb)
+
+    def test_schema_is_built_on_first_request(self):
+        """Test the documentation views are only built when the schema is first requested, and then reused."""
+        get_view.cache_clear()
+        self.client.get(reverse('list-appointments'))
+        self.assertEqual(get_view.cache_info().currsize, 0)
+
+        for _ in range(2):
+            response = self.client.get(reverse('schema-json', kwargs={'format': '.json'}))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn('/appointment/book/', response.json()['paths'])
+
+        info = get_view.cache_info()
+        self.assertEqual((info.currsize, info.misses), (1, 1))
+
+
+class SearchCachingAndThrottlingTests(MondayCalendarTestCase):
+
+    def test_concurrent_searches_share_one_computation(self):
+        """Test concurrent identical searches are coalesced into a single slot computation."""
+        calls = []
+
+        def slow_compute(calendar_owner, date):
+            calls.append(date)
+            time.sleep(0.2)
+            return [], None
+
+        with mock.patch('appointments.slots.compute_slots_with_expiry', side_effect=slow_compute):
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(lambda _: get_available_slots(self.calendar_owner, self.date), range(8)))
+
+        self.assertEqual(calls, [self.date])
+        self.assertEqual(results, [[]] * 8)
+
+    def test_booking_invalidates_cached_slots(self):
+        """Test a committed booking removes the booked slot from cached search results."""
+        self.assertEqual(self.search(), ['09:00', '10:00', '11:00'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.book(hour=10)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(self.search(), ['09:00', '11:00'])
+
+    def test_search_computed_during_a_booking_is_not_cached(self):
+        """Test a search that read the database before a booking committed does not cache its result."""
+        def compute_while_booking(calendar_owner, date):
+            update_cached_slots(calendar_owner, date, booked=[datetime.combine(date, dt_time(10), tzinfo=timezone.utc)])
+            return [{'start_time': f"{date}T10:00:00", 'end_time': f"{date}T11:00:00"}], None
+
+        with mock.patch('appointments.slots.compute_slots_with_expiry', side_effect=compute_while_booking):
+            get_available_slots(self.calendar_owner, self.date)
+
+        self.assertIsNone(cache.get(slots_cache_key(self.calendar_owner, self.date)))
+
+    def test_concurrent_patches_drop_the_cached_date(self):
+        """Test a patch that finds the date locked by another patch drops it instead of overwriting it."""
+        self.search()
+        key = slots_cache_key(self.calendar_owner, self.date)
+        cache.add(f"{key}:lock", 1)
+
+        update_cached_slots(self.calendar_owner, self.date, booked=[datetime.combine(self.date, dt_time(9), tzinfo=timezone.utc)])
+
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(len(self.search()), 3)
+
+    @override_settings(SEARCH_RATE_LIMIT={
+        'RATE': 0.001, 'BURST': 2, 'BACKEND': 'appointments.throttling.InMemoryTokenBucketBackend'
+    })
+    def test_search_rate_limit(self):
+        """Test a client is throttled once its token bucket is empty."""
+        self.client.defaults['REMOTE_ADDR'] = '10.0.0.31'
+
+        self.assertEqual(self.search_response().status_code, status.HTTP_200_OK)
+        self.assertEqual(self.search_response().status_code, status.HTTP_200_OK)
+        response = self.search_response()
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+
+
+    def test_shared_rate_limit_under_concurrent_burst(self):
+        """
+        Test concurrent requests of one client through the shared cache backend never share a token,
+        and are all allowed while tokens are left.
+        """
+        cache.clear()
+        backend = CacheTokenBucketBackend({})
+        cache_get = backend.cache.get
+
+        def slow_get(*args, **kwargs):
+            # Widen the read-modify-write window the way a network round trip to Redis would.
+            value = cache_get(*args, **kwargs)
+            time.sleep(0.005)
+            return value
+
+        def burst(key, capacity):
+            with ThreadPoolExecutor(max_workers=20) as executor:
+                return list(executor.map(lambda _: backend.consume(key, 0.001, capacity)[0], range(20)))
+
+        with mock.patch.object(backend.cache, 'get', side_effect=slow_get):
+            self.assertEqual(burst('throttle:burst', 5).count(True), 5)
+            self.assertEqual(burst('throttle:roomy', 20).count(True), 20)
+
+    def test_shared_rate_limit_slides_over_the_previous_window(self):
+        """Test the shared cache backend counts the part of the previous window that still overlaps."""
+        cache.clear()
+        backend = CacheTokenBucketBackend({})
+
+        # RATE 1 and BURST 4 allow 4 requests per 4-second window.
+        with mock.patch('appointments.throttling.time.time', return_value=4001.0):
+            self.assertEqual([backend.consume('throttle:slide', 1, 4)[0] for _ in range(5)], [True] * 4 + [False])
+
+        # Halfway through the next window half of the previous requests still count.
+        with mock.patch('appointments.throttling.time.time', return_value=4006.0):
+            self.assertEqual([backend.consume('throttle:slide', 1, 4)[0] for _ in range(3)], [True, True, False])
+            self.assertEqual(backend.consume('throttle:slide', 1, 4)[1], 1)
+
+class OwnerUtilizationTests(TestCase):
+
+    def setUp(self):
+        """Set up two calendar owners with weekly availability and a few appointments."""
+        self.client = APIClient()
+        self.monday = datetime(2030, 1, 7, tzinfo=timezone.utc)
+        self.owners = [
+            CalendarOwner.objects.create(name="Himanshu", email="himanshu.anuragi@mail.com"),
+            CalendarOwner.objects.create(name="Second Owner", email="second.owner@mail.com"),
+        ]
+
+        for owner in self.owners:
+            Availability.objects.create(calendar_owner=owner, day_of_week='Monday', start_time='09:00:00', end_time='12:00:00')
+            Availability.objects.create(calendar_owner=owner, day_of_week='Wednesday', start_time='10:00:00', end_time='12:00:00')
+
+        for hours in (9, 10, 24 * 7 + 9):
+            start_time = self.monday + timedelta(hours=hours)
+            Appointment.objects.create(
+                calendar_owner=self.owners[0], invitee_name="Invitee", invitee_email="invitee@mail.com",
+                start_time=start_time, end_time=start_time + timedelta(hours=1)
+            )
+
+    def test_utilization_for_many_owners(self):
+        """Test booked hours, capacity and busiest hours are aggregated for several owners at once."""
+        url = reverse('owner-utilization')
+        params = {'owner_email': [owner.email for owner in self.owners], 'start_date': '2030-01-07', 'end_date': '2030-01-20'}
+
+        with self.assertNumQueries(3):
+            response = self.client.get(url, params)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        busy, idle = response.data
+
+        self.assertEqual((busy['booked_hours'], busy['available_hours'], busy['utilization']), (3.0, 10.0, 30.0))
+        self.assertEqual(busy['busiest_hours'][0], {'hour': 9, 'appointments': 2})
+        self.assertEqual(busy['daily_booked_hours'], {'2030-01-07': 2.0, '2030-01-14': 1.0})
+        self.assertEqual((idle['booked_hours'], idle['available_hours'], idle['utilization']), (0, 10.0, 0.0))
+
+    def test_utilization_includes_archived_appointments(self):
+        """Test past ranges count appointments already moved to the archive."""
+        for start_time in (datetime(2023, 10, 9, 9, tzinfo=timezone.utc), datetime(2023, 10, 16, 9, tzinfo=timezone.utc)):
+            Appointment.objects.create(
+                calendar_owner=self.owners[0], invitee_name="Invitee", invitee_email="invitee@mail.com",
+                start_time=start_time, end_time=start_time + timedelta(hours=1)
+            )
+        call_command('archive_appointments', '--before', '2023-10-16', stdout=StringIO())
+
+        url = reverse('owner-utilization')
+        params = {'owner_email': [self.owners[0].email], 'start_date': '2023-10-09', 'end_date': '2023-10-22'}
+
+        with self.assertNumQueries(5):
+            response = self.client.get(url, params)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        report = response.data[0]
+        self.assertEqual((report['booked_hours'], report['available_hours'], report['utilization']), (2.0, 10.0, 20.0))
+        self.assertEqual(report['busiest_hours'], [{'hour': 9, 'appointments': 2}])
+        self.assertEqual(report['daily_booked_hours'], {'2023-10-09': 1.0, '2023-10-16': 1.0})
+
+    def test_utilization_unknown_owner(self):
+        """Test the report fails with 404 when one of the requested owners does not exist."""
+        url = reverse('owner-utilization')
+        response = self.client.get(url, {'owner_email': ['nobody@mail.com'], 'start_date': '2030-01-07', 'end_date': '2030-01-13'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class CancelAndRescheduleTests(MondayCalendarTestCase):
+
+    def setUp(self):
+        """Set up a calendar owner with availability on Mondays and one booked appointment."""
+        super().setUp()
+        Appointment.objects.create(
+            calendar_owner=self.calendar_owner, invitee_name="Invitee", invitee_email="invitee@mail.com",
+            start_time=self.start_time, end_time=self.start_time + timedelta(hours=1)
+        )
+
+    def reschedule(self, hour):
+        """Helper function to move the booked appointment to another hour of the same day."""
+        return self.client.post(reverse('reschedule-appointment'), {
+            "owner_email": self.calendar_owner.email,
+            "start_time": self.start_time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "new_start_time": self.start_time.replace(hour=hour).strftime("%Y-%m-%dT%H:%M:%S")
+        }, format='json')
+
+    def test_cancel_frees_slot(self):
+        """Test cancelling an appointment deletes it and adds its slot back to cached search results."""
+        self.assertEqual(self.search(), ['10:00', '11:00'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('cancel-appointment'), {
+                "owner_email": self.calendar_owner.email,
+                "start_time": self.start_time.strftime("%Y-%m-%dT%H:%M:%S")
+            }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(Appointment.objects.exists())
+        # Only the owner lookup, the cached slots were patched instead of recomputed.
+        with self.assertNumQueries(1):
+            self.assertEqual(self.search(), ['09:00', '10:00', '11:00'])
+        self.assertEqual(OutboxEvent.objects.get().event_type, 'appointment.cancelled')
+
+    def test_reschedule_swaps_slots(self):
+        """Test rescheduling moves the appointment and swaps the slots in cached search results."""
+        self.assertEqual(self.search(), ['10:00', '11:00'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.reschedule(11)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Appointment.objects.get().start_time, self.start_time.replace(hour=11))
+        # Only the owner lookup, the cached slots were patched instead of recomputed.
+        with self.assertNumQueries(1):
+            self.assertEqual(self.search(), ['09:00', '10:00'])
+        self.assertEqual(OutboxEvent.objects.get().payload['previous_start_time'], self.start_time.isoformat())
+
+    def test_reschedule_to_unavailable_slot_fail(self):
+        """Test rescheduling into a booked or unavailable slot keeps the original appointment."""
+        other_start = self.start_time.replace(hour=10)
+        Appointment.objects.create(
+            calendar_owner=self.calendar_owner, invitee_name="Other", invitee_email="other@mail.com",
+            start_time=other_start, end_time=other_start + timedelta(hours=1)
+        )
+
+        self.assertEqual(self.reschedule(10).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.reschedule(12).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(Appointment.objects.filter(start_time=self.start_time).exists())
+
+
+@st.composite
+def slot_inputs(draw):
+    """Random (date, availability windows, booked start times) inputs for the slot generators."""
+    day = draw(st.dates(min_value=date(2000, 1, 1), max_value=date(2100, 12, 31)))
+    whole_seconds = st.builds(dt_time, st.integers(0, 23), st.integers(0, 59), st.integers(0, 59))
+    windows = draw(st.lists(st.tuples(st.one_of(whole_seconds, st.times()), st.one_of(whole_seconds, st.times())), max_size=6))
+
+    # Mostly book starts that line up with slots, plus arbitrary times on the date and the next day.
+    slot_starts = [
+        datetime.combine(day, window_start) + timedelta(hours=offset)
+        for window_start, _ in windows
+        for offset in range(24)
+    ]
+    any_start = st.datetimes(min_value=datetime.combine(day, dt_time.min), max_value=datetime.combine(day + timedelta(days=1), dt_time.max))
+    booked = draw(st.lists(st.sampled_from(slot_starts) | any_start if slot_starts else any_start, max_size=12))
+
+    return day, windows, set(booked)
+
+
+# Hypothesis runs 100 examples per property by default; HYPOTHESIS_PROFILE=thorough runs 1000.
+hypothesis_settings.register_profile('thorough', max_examples=1000)
+hypothesis_settings.load_profile(os.environ.get('HYPOTHESIS_PROFILE', 'default'))
+
+
+class SlotGenerationPropertyTests(SimpleTestCase):
+
+    @hypothesis_settings(deadline=None)
+    @given(slot_inputs())
+    def test_generate_slots_matches_reference(self, inputs):
+        """Test the optimized slot generator returns exactly what the reference algorithm returns."""
+        self.assertEqual(generate_slots(*inputs), reference_slots(*inputs))
+
+    @skipUnless(os.environ.get('RUN_BENCHMARKS'), "Set RUN_BENCHMARKS=1 to run timing benchmarks.")
+    def test_generate_slots_benchmark(self):
+        """Benchmark both slot generators over the same generated inputs; the optimized one must be faster."""
+        inputs = []
+
+        @hypothesis_settings(max_examples=300, database=None, derandomize=True, phases=[Phase.generate])
+        @given(slot_inputs())
+        def collect(case):
+            inputs.append(case)
+
+        collect()
+
+        def run(generator):
+            return min(timeit.repeat(lambda: [generator(*case) for case in inputs], number=5, repeat=5))
+
+        reference_time = run(reference_slots)
+        optimized_time = run(generate_slots)
+        self.assertLess(
+            optimized_time, reference_time,
+            f"generate_slots {optimized_time * 1000:.1f}ms vs reference_slots {reference_time * 1000:.1f}ms "
+            f"over {len(inputs)} inputs"
+        )
+
+
+class SlotHoldTests(MondayCalendarTestCase):
+    availability_end = '11:00:00'
+
+    def hold(self, expires_at):
+        """Helper function to create a hold on the 09:00 slot directly."""
+        return SlotHold.objects.create(
+            calendar_owner=self.calendar_owner, invitee_email="invitee@mail.com",
+            start_time=self.start_time, end_time=self.start_time + timedelta(hours=1), expires_at=expires_at
+        )
+
+    def hold_slot(self, hour=9, invitee_email="invitee@mail.com"):
+        """Helper function to hold a slot of the calendar owner through the API."""
+        return self.client.post(reverse('hold-slot'), {
+            "owner_email": self.calendar_owner.email,
+            "invitee_email": invitee_email,
+            "start_time": self.start_time.replace(hour=hour).strftime("%Y-%m-%dT%H:%M:%S"),
+            "minutes": 5
+        }, format='json')
+
+    def test_hold_blocks_slot_until_booked_with_token(self):
+        """Test a held slot is busy for search and other bookings, and can be booked with its token."""
+        self.assertEqual(self.search(), ['09:00', '10:00'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.hold_slot()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(self.search(), ['10:00'])
+        self.assertEqual(self.book().data["message"], "This slot is currently held.")
+
+        response = self.book(hold_token=response.data["hold_token"])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(SlotHold.objects.exists())
+
+    def test_hold_token_only_books_its_own_slot(self):
+        """Test a hold token cannot book another slot or invitee, and its hold is kept."""
+        hold = self.hold(expires_at=datetime.now(timezone.utc) + timedelta(minutes=5))
+
+        response = self.book(hour=10, hold_token=str(hold.token))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.book(hold_token=str(hold.token), invitee_email="someone.else@mail.com")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertEqual(list(SlotHold.objects.all()), [hold])
+        self.assertFalse(Appointment.objects.exists())
+
+    def test_invitee_holds_one_slot_at_a_time(self):
+        """Test an invitee cannot hold a second slot of the owner while its first hold is active."""
+        self.assertEqual(self.hold_slot().status_code, status.HTTP_201_CREATED)
+
+        response = self.hold_slot(hour=10, invitee_email="INVITEE@mail.com")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["message"], "This invitee already holds a slot of this calendar owner.")
+
+        self.assertEqual(self.hold_slot(hour=10, invitee_email="other@mail.com").status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SlotHold.objects.count(), 2)
+
+    @override_settings(HOLD_RATE_LIMIT={
+        'RATE': 0.001, 'BURST': 2, 'BACKEND': 'appointments.throttling.InMemoryTokenBucketBackend'
+    })
+    def test_hold_rate_limit(self):
+        """Test a client is throttled once its hold token bucket is empty, whatever invitee it sends."""
+        self.client.defaults['REMOTE_ADDR'] = '10.0.0.35'
+
+        self.assertEqual(self.hold_slot(invitee_email="first@mail.com").status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.hold_slot(hour=10, invitee_email="second@mail.com").status_code, status.HTTP_201_CREATED)
+        response = self.hold_slot(hour=10, invitee_email="third@mail.com")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+
+    def test_expired_hold_is_ignored(self):
+        """Test an expired hold neither hides the slot from search nor blocks booking."""
+        self.hold(expires_at=datetime.now(timezone.utc) - timedelta(minutes=1))
+
+        self.assertEqual(self.search(), ['09:00', '10:00'])
+        self.assertEqual(self.book().status_code, status.HTTP_201_CREATED)
+
+    def test_sweep_deletes_only_expired_holds(self):
+        """Test the sweeper deletes expired holds in batches and keeps active ones."""
+        now = datetime.now(timezone.utc)
+        for minutes in (-3, -2, -1):
+            self.hold(expires_at=now + timedelta(minutes=minutes))
+        active = self.hold(expires_at=now + timedelta(minutes=5))
+
+        call_command('sweep_expired_holds', '--batch-size', '2', stdout=StringIO())
+
+        self.assertEqual(list(SlotHold.objects.all()), [active])
+
+
+@override_settings(CALENDAR_SHARD_ALIASES=['default', 'shard_1', 'shard_2'])
+class OwnerShardRouterTests(SimpleTestCase):
+
+    def test_owners_are_spread_over_shards(self):
+        """Test every owner maps to one stable shard, whatever the case of its email."""
+        shards = {shard_for_email(f"owner{i}@mail.com") for i in range(100)}
+        self.assertEqual(shards, {'default', 'shard_1', 'shard_2'})
+        self.assertEqual(shard_for_email("Owner1@Mail.com"), shard_for_email("owner1@mail.com"))
+
+    @override_settings(CALENDAR_SHARD_ALIASES=['default'])
+    def test_single_shard_uses_default(self):
+        """Test everything stays on 'default' when sharding is off."""
+        self.assertEqual(shard_for_email("owner@mail.com"), 'default')
+
+    def test_rows_follow_their_owner(self):
+        """Test new owners are written to their shard and their rows next to them."""
+        router = OwnerShardRouter()
+        owner = CalendarOwner(name="Owner", email="owner1@mail.com")
+        self.assertEqual(router.db_for_write(CalendarOwner, instance=owner), shard_for_email(owner.email))
+
+        owner._state.db = 'shard_2'
+        appointment = Appointment(calendar_owner=owner, invitee_name="Invitee", invitee_email="invitee@mail.com")
+        self.assertEqual(router.db_for_write(Appointment, instance=appointment), 'shard_2')
+        self.assertIsNone(router.db_for_read(Appointment))
+
+    def test_migrations_per_shard(self):
+        """Test the appointments tables are created on every shard and other apps only on 'default'."""
+        router = OwnerShardRouter()
+        self.assertTrue(router.allow_migrate('shard_1', 'appointments'))
+        self.assertFalse(router.allow_migrate('shard_1', 'contenttypes'))
+        self.assertTrue(router.allow_migrate('default', 'contenttypes'))
+
+    def test_commands_select_shards(self):
+        """Test commands process every shard by default, one with --database, and reject unknown ones."""
+        self.assertEqual(selected_shards(), ['default', 'shard_1', 'shard_2'])
+        self.assertEqual(selected_shards('shard_1'), ['shard_1'])
+        with self.assertRaises(ValueError):
+            selected_shards('shard_9')
+
+    def test_run_on_shards_keeps_order(self):
+        """Test the fan-out returns one result per shard, in the order of the shards."""
+        self.assertEqual(run_on_shards(str.upper, ['default', 'shard_1', 'shard_2']), ['DEFAULT', 'SHARD_1', 'SHARD_2'])
+
+
+@skipUnless('shard_1' in settings.DATABASES, "Run with `manage.py test`, which declares the 'shard_1' database.")
+@override_settings(CALENDAR_SHARD_ALIASES=['default', 'shard_1'])
+class ShardedOwnerTests(TransactionTestCase):
+    # Owners are spread over 'default' and the 'shard_1' database declared for the test run.
+    # TransactionTestCase commits, so the threads of the utilization fan-out can read what the tests wrote.
+    SHARD = 'shard_1'
+    databases = {'default', 'shard_1'}
+
+    def setUp(self):
+        """Set up one calendar owner on each shard, both available on Mondays."""
+        cache.clear()
+        self.client = APIClient()
+        self.emails = {}
+        for i in range(100):
+            self.emails.setdefault(shard_for_email(f"owner{i}@mail.com"), f"owner{i}@mail.com")
+
+        for email in self.emails.values():
+            response = self.client.post(reverse('availability-setup'), {
+                "owner_name": "Owner",
+                "owner_email": email,
+                "availability": {"Monday": [{"start_time": "09:00:00", "end_time": "12:00:00"}]}
+            }, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.date = (get_next_monday() + timedelta(days=7)).date()
+
+    def book(self, email, hour):
+        """Helper function to book a slot of the given owner."""
+        return self.client.post(reverse('book-appointment'), {
+            "owner_email": email,
+            "invitee_name": "Invitee",
+            "invitee_email": "invitee@mail.com",
+            "start_time": f"{self.date}T{hour:02d}:00:00"
+        }, format='json')
+
+    def test_writes_stay_on_the_owner_shard(self):
+        """Test booking and rescheduling for an owner on another shard only touch that shard."""
+        email = self.emails[self.SHARD]
+
+        self.assertEqual(self.book(email, 9).status_code, status.HTTP_201_CREATED)
+        response = self.client.post(reverse('reschedule-appointment'), {
+            "owner_email": email,
+            "start_time": f"{self.date}T09:00:00",
+            "new_start_time": f"{self.date}T11:00:00"
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        appointment = Appointment.objects.using(self.SHARD).get()
+        self.assertEqual((appointment.calendar_owner.email, appointment.start_time.hour), (email, 11))
+        self.assertEqual(OutboxEvent.objects.using(self.SHARD).count(), 2)
+        self.assertFalse(Appointment.objects.using('default').exists())
+        self.assertFalse(OutboxEvent.objects.using('default').exists())
+        self.assertFalse(CalendarOwner.objects.using('default').filter(email=email).exists())
+
+    def test_utilization_merges_every_shard(self):
+        """Test the utilization report fans out to every shard and merges their owners."""
+        for hour, email in zip((9, 10), self.emails.values()):
+            self.assertEqual(self.book(email, hour).status_code, status.HTTP_201_CREATED)
+
+        response = self.client.get(reverse('owner-utilization'), {'start_date': str(self.date), 'end_date': str(self.date)})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row['owner_email'], row['booked_hours'], row['available_hours']) for row in response.data],
+            sorted((email, 1.0, 3.0) for email in self.emails.values())
+        )
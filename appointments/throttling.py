@@ -0,0 +1,119 @@
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.throttling import BaseThrottle
+
+
+class InMemoryTokenBucketBackend:
+    """Token buckets kept in this process. Each worker process limits clients on its own."""
+
+    # Buckets idle long enough to be full again are dropped once this many clients are tracked.
+    MAX_BUCKETS = 10000
+
+    def __init__(self, options):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key, rate, capacity):
+        now = time.monotonic()
+        with self._lock:
+            allowed, tokens, wait = take_token(self._buckets.get(key), now, rate, capacity)
+            self._buckets[key] = (tokens, now)
+
+            if len(self._buckets) > self.MAX_BUCKETS:
+                refill_time = capacity / rate
+                self._buckets = {
+                    bucket_key: bucket for bucket_key, bucket in self._buckets.items()
+                    if now - bucket[1] < refill_time
+                }
+        return allowed, wait
+
+
+class CacheTokenBucketBackend:
+    """
+    Rate limits stored in a Django cache, shared by every worker using the same cache (e.g. Redis
+    or Memcached). A bucket of `capacity` tokens refilled at `rate` per second is approximated by
+    a sliding window that allows `capacity` requests per `capacity / rate` seconds: the count of
+    the current window plus the share of the previous window's count that still overlaps it.
+    Requests are counted with the atomic `cache.incr`, so concurrent requests of one client never
+    share a token, and no request waits for another.
+    """
+
+    def __init__(self, options):
+        self.cache = caches[options.get('CACHE_ALIAS', 'default')]
+
+    def consume(self, key, rate, capacity):
+        window = capacity / rate
+        now = time.time()
+        index, elapsed = divmod(now, window)
+        current_key, previous_key = f"{key}:{int(index)}", f"{key}:{int(index) - 1}"
+
+        try:
+            count = self.cache.incr(current_key)
+        except ValueError:
+            self.cache.add(current_key, 0, math.ceil(2 * window) + 1)
+            count = self.cache.incr(current_key)
+
+        previous = self.cache.get(previous_key, 0)
+        used = previous * (1 - elapsed / window) + count
+        if used <= capacity:
+            return True, 0
+
+        # Refused requests do not use up the window.
+        self.cache.decr(current_key)
+        if previous:
+            return False, min(window - elapsed, (used - capacity) * window / previous)
+        return False, window - elapsed
+
+
+def take_token(bucket, now, rate, capacity):
+    """Refill a (tokens, updated_at) bucket up to `now` and try to take one token from it."""
+    tokens, updated_at = bucket if bucket is not None else (capacity, now)
+    tokens = min(capacity, tokens + (now - updated_at) * rate)
+
+    if tokens >= 1:
+        return True, tokens - 1, 0
+    return False, tokens, (1 - tokens) / rate
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(config):
+    with _backends_lock:
+        if config['BACKEND'] not in _backends:
+            _backends[config['BACKEND']] = import_string(config['BACKEND'])(config)
+        return _backends[config['BACKEND']]
+
+
+class TokenBucketRateThrottle(BaseThrottle):
+    """
+    Token bucket rate limit per client. `rate_setting` names a settings dict with RATE
+    (tokens refilled per second), BURST (bucket capacity) and BACKEND (backend class path).
+    """
+    rate_setting = None
+
+    def allow_request(self, request, view):
+        config = getattr(settings, self.rate_setting, None)
+        if not config:
+            return True
+
+        key = f"throttle:{self.rate_setting}:{self.get_ident(request)}"
+        allowed, self.wait_seconds = get_backend(config).consume(key, config['RATE'], config['BURST'])
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class SearchRateThrottle(TokenBucketRateThrottle):
+    rate_setting = 'SEARCH_RATE_LIMIT'
+
+
+class HoldRateThrottle(TokenBucketRateThrottle):
+    rate_setting = 'HOLD_RATE_LIMIT'
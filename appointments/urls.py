@@ -1,9 +1,16 @@
 from django.urls import path
-from .views import AvailabilitySetupAPI, SearchAvailableSlotsAPI, BookAppointmentAPI, ListUpcomingAppointmentsAPI
+from .views import AvailabilitySetupAPI, SearchAvailableSlotsAPI, BookAppointmentAPI, ListUpcomingAppointmentsAPI, \
+    AppointmentHistoryAPI, OwnerUtilizationAPI, CancelAppointmentAPI, RescheduleAppointmentAPI, \
+    HoldSlotAPI
 
 urlpatterns = [
     path('availability/setup/', AvailabilitySetupAPI.as_view(), name='availability-setup'),
     path('availability/search/', SearchAvailableSlotsAPI.as_view(), name='search-available-slots'),
     path('appointment/book/', BookAppointmentAPI.as_view(), name='book-appointment'),
+    path('appointment/hold/', HoldSlotAPI.as_view(), name='hold-slot'),
+    path('appointment/cancel/', CancelAppointmentAPI.as_view(), name='cancel-appointment'),
+    path('appointment/reschedule/', RescheduleAppointmentAPI.as_view(), name='reschedule-appointment'),
     path('appointments', ListUpcomingAppointmentsAPI.as_view(), name='list-appointments'),
+    path('appointments/history', AppointmentHistoryAPI.as_view(), name='appointment-history'),
+    path('analytics/utilization/', OwnerUtilizationAPI.as_view(), name='owner-utilization'),
 ]
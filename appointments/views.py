@@ -2,12 +2,27 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.exceptions import ValidationError
-from .models import CalendarOwner, Availability, Appointment
+from .models import CalendarOwner, Availability, Appointment, AppointmentArchive, SlotHold
 from .serializers import CalendarOwnerSerializer, SearchAvailableSlotsSerializer, BookAppointmentSerializer, \
-    AppointmentSerializer, UpcomingAppointmentsSerializer, AvailabilitySerializer
+    AppointmentSerializer, UpcomingAppointmentsSerializer, AvailabilitySerializer, AppointmentHistorySerializer, \
+    AppointmentHistoryEntrySerializer, OwnerUtilizationSerializer, CancelAppointmentSerializer, \
+    RescheduleAppointmentSerializer, HoldSlotSerializer
+from .analytics import owner_utilization
+from .outbox import enqueue_event, appointment_payload
+from .routers import run_on_shards, shard_aliases, shard_for_email
+from .slots import compute_available_slots, get_available_slots, update_cached_slots, invalidate_owner_slots
+from .throttling import HoldRateThrottle, SearchRateThrottle
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import BooleanField, Value
+from django.utils import timezone as django_timezone
 from django.utils.dateparse import parse_time
-from datetime import datetime, timedelta
-from django.test.client import RequestFactory
+from datetime import datetime, timedelta, timezone
+
+
+def get_calendar_owner(email):
+    """Look up a calendar owner by lower-cased email on the shard that holds it."""
+    return CalendarOwner.objects.using(shard_for_email(email)).filter(email=email).first()
 
 class AvailabilitySetupAPI(APIView):
     def post(self, request):
@@ -57,35 +72,39 @@ class AvailabilitySetupAPI(APIView):
         calendar_owner_name = owner_serializer.validated_data.get('owner_name')
         calendar_owner_email = owner_serializer.validated_data.get('owner_email').lower()
 
-        calendar_owner, created = CalendarOwner.objects.get_or_create(
+        db = shard_for_email(calendar_owner_email)
+        calendar_owner, created = CalendarOwner.objects.using(db).get_or_create(
             email=calendar_owner_email,
             defaults={'name': calendar_owner_name}
         )
 
-        for day, time_slots in availability_serializer.validated_data.items():
-            Availability.objects.filter(calendar_owner=calendar_owner, day_of_week=day).delete()
-
-            for time_slot in time_slots:
-                start_time, end_time = time_slot['start_time'], time_slot['end_time']
+        with transaction.atomic(using=db):
+            for day, time_slots in availability_serializer.validated_data.items():
+                Availability.objects.using(db).filter(calendar_owner=calendar_owner, day_of_week__iexact=day).delete()
 
-                if start_time > end_time:
-                    return Response({"message": "Invalid time slot: start time must be before end time."}, status=status.HTTP_400_BAD_REQUEST)
+                Availability.objects.using(db).bulk_create([
+                    Availability(
+                        calendar_owner=calendar_owner,
+                        day_of_week=day.capitalize(),
+                        start_time=time_slot['start_time'],
+                        end_time=time_slot['end_time']
+                    )
+                    for time_slot in time_slots
+                ])
 
-                Availability.objects.create(
-                    calendar_owner=calendar_owner,
-                    day_of_week=day,
-                    start_time=start_time,
-                    end_time=end_time
-                )
+            transaction.on_commit(lambda: invalidate_owner_slots(calendar_owner), using=db)
 
         return Response({"message": "Availability set successfully!"}, status=status.HTTP_201_CREATED)
 
 
 class SearchAvailableSlotsAPI(APIView):
+    throttle_classes = [SearchRateThrottle]
+
     def get(self, request):
         """
         Search for available time slots for a calendar owner on a specific date. 
         It returns all available slots where no appointment exists.
+        Results are cached for a few seconds and clients are rate limited (HTTP 429).
         --------------------------------------------------------------------------------------------------
         Request Example:
             GET /api/appointments/available-slots/?owner_email=himanshu.anuragi@mail.com&date=2024-10-15
@@ -118,30 +137,57 @@ class SearchAvailableSlotsAPI(APIView):
 
         calendar_owner_email = calendar_owner_email.lower()
 
-        calendar_owner = CalendarOwner.objects.filter(email=calendar_owner_email).first()
+        calendar_owner = get_calendar_owner(calendar_owner_email)
         if not calendar_owner:
             return Response({"message": "Calendar owner not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        availability = Availability.objects.filter(calendar_owner=calendar_owner, day_of_week=date.strftime("%A"))
-
-        appointments = Appointment.objects.filter(calendar_owner=calendar_owner, start_time__date=date)
-
-        available_slots = []
-
-        for slot in availability:
-            start_time = datetime.combine(date, slot.start_time)
-            end_time = datetime.combine(date, slot.end_time)
-
-            while start_time + timedelta(hours=1) <= end_time:
-                if not appointments.filter(start_time=start_time).exists():
-                    available_slots.append({
-                        'start_time': start_time.strftime("%Y-%m-%dT%H:%M:%S"),
-                        'end_time': (start_time + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%S")
-                    })
-                start_time += timedelta(hours=1)
+        available_slots = get_available_slots(calendar_owner, date)
 
         return Response(available_slots, status=status.HTTP_200_OK)
 
+def find_slot_conflict(calendar_owner, start_time, exclude=None, hold_token=None):
+    """
+    Return why the one-hour slot starting at `start_time` cannot be booked for the calendar owner,
+    or None if it is free. `exclude` is an appointment to ignore, e.g. the one being rescheduled,
+    and `hold_token` identifies the caller's own hold on the slot.
+    Call it inside the transaction that claims the slot.
+    """
+    if start_time.minute != 0:
+        return "Slot must start at the top of the hour."
+
+    db = calendar_owner._state.db
+    end_time = start_time + timedelta(hours=1)
+
+    existing_appointments = Appointment.objects.using(db).filter(
+        calendar_owner=calendar_owner,
+        start_time__lt=end_time,
+        end_time__gt=start_time
+    )
+    if exclude is not None:
+        existing_appointments = existing_appointments.exclude(pk=exclude.pk)
+
+    if existing_appointments.exists():
+        return "This slot is already booked."
+
+    active_holds = SlotHold.objects.using(db).filter(
+        calendar_owner=calendar_owner,
+        start_time__lt=end_time,
+        end_time__gt=start_time,
+        expires_at__gt=django_timezone.now()
+    )
+    if hold_token is not None:
+        active_holds = active_holds.exclude(token=hold_token)
+
+    if active_holds.exists():
+        return "This slot is currently held."
+
+    available_slots = compute_available_slots(calendar_owner, start_time.date(), hold_token=hold_token)
+
+    if not any(slot['start_time'] == start_time.strftime("%Y-%m-%dT%H:%M:%S") for slot in available_slots):
+        return "This slot is not available."
+
+    return None
+
 class BookAppointmentAPI(APIView):
     def post(self, request):
         """
@@ -153,8 +199,11 @@ class BookAppointmentAPI(APIView):
                 "owner_email": "himanshu.anuragi@mail.com",
                 "invitee_name": "Invitee",
                 "invitee_email": "invitee@mail.com",
-                "start_time": "2024-10-15T09:00:00"
+                "start_time": "2024-10-15T09:00:00",
+                "hold_token": "0b7d9d1c-3a47-4a43-9f53-ff5ae5a2a1f5"
             }
+        `hold_token` is optional and turns a hold from /api/appointment/hold/ into the booking. It must belong to
+        an active hold on the same slot for the same invitee.
         -----------------------------------------------------------------
         -----------------------------------------------------------------
         Response Example:
@@ -172,50 +221,251 @@ class BookAppointmentAPI(APIView):
         invitee_name = serializer.validated_data.get('invitee_name')
         invitee_email = serializer.validated_data.get('invitee_email')
         start_time = serializer.validated_data.get('start_time')
+        hold_token = serializer.validated_data.get('hold_token')
 
         if start_time.replace(tzinfo=None) < datetime.now():
             return Response({"message": "Appointments cannot be scheduled in the past."}, status=status.HTTP_400_BAD_REQUEST)
 
         calendar_owner_email = calendar_owner_email.lower()
 
-        calendar_owner = CalendarOwner.objects.filter(email=calendar_owner_email).first()
+        calendar_owner = get_calendar_owner(calendar_owner_email)
         if not calendar_owner:
             return Response({"message": "Calendar owner not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        if start_time.minute != 0:
-            return Response({"message": "Slot must start at the top of the hour."}, status=status.HTTP_400_BAD_REQUEST)
+        db = calendar_owner._state.db
+
+        try:
+            with transaction.atomic(using=db):
+                hold = None
+                if hold_token is not None:
+                    hold = SlotHold.objects.using(db).filter(
+                        calendar_owner=calendar_owner,
+                        token=hold_token,
+                        start_time=start_time,
+                        invitee_email__iexact=invitee_email,
+                        expires_at__gt=django_timezone.now()
+                    ).first()
+                    if hold is None:
+                        return Response({"message": "The hold token does not match an active hold on this slot."},
+                                        status=status.HTTP_400_BAD_REQUEST)
+
+                conflict = find_slot_conflict(calendar_owner, start_time, hold_token=hold_token)
+                if conflict:
+                    return Response({"message": conflict}, status=status.HTTP_400_BAD_REQUEST)
+
+                appointment = Appointment.objects.using(db).create(
+                    calendar_owner=calendar_owner,
+                    invitee_name=invitee_name,
+                    invitee_email=invitee_email,
+                    start_time=start_time,
+                    end_time=start_time + timedelta(hours=1)
+                )
+                enqueue_event('appointment.booked', appointment_payload(appointment), using=db)
+                if hold is not None:
+                    hold.delete()
+                transaction.on_commit(
+                    lambda: update_cached_slots(calendar_owner, start_time.date(), booked=[start_time]), using=db
+                )
+        except IntegrityError:
+            return Response({"message": "This slot is already booked."}, status=status.HTTP_400_BAD_REQUEST)
 
-        end_time = start_time + timedelta(hours=1)
+        return Response({"message": "Appointment booked successfully!"}, status=status.HTTP_201_CREATED)
 
-        existing_appointments = Appointment.objects.filter(
-            calendar_owner=calendar_owner,
-            start_time__lt=end_time,
-            end_time__gt=start_time
-        )
+class HoldSlotAPI(APIView):
+    throttle_classes = [HoldRateThrottle]
 
-        if existing_appointments.exists():
-            return Response({"message": "This slot is already booked."}, status=status.HTTP_400_BAD_REQUEST)
+    def post(self, request):
+        """
+        Reserve a slot for a few minutes while the invitee completes checkout. Until the hold expires,
+        search and booking treat the slot as busy for everybody except a booking with the returned hold_token.
+        The hold lasts `minutes` (default 10) up to a maximum of 30 minutes.
+        An invitee can hold only one slot of a calendar owner at a time, and clients are rate limited.
+        -----------------------------------------------------------------
+        Request Example:
+            POST /api/appointment/hold/
+            {
+                "owner_email": "himanshu.anuragi@mail.com",
+                "invitee_email": "invitee@mail.com",
+                "start_time": "2024-10-15T09:00:00",
+                "minutes": 10
+            }
+        -----------------------------------------------------------------
+        -----------------------------------------------------------------
+        Response Example:
+            HTTP 201 Created
+            {
+                "message": "Slot held successfully!",
+                "hold_token": "0b7d9d1c-3a47-4a43-9f53-ff5ae5a2a1f5",
+                "expires_at": "2024-10-14T18:10:00Z"
+            }
+        -----------------------------------------------------------------
+        """
+        serializer = HoldSlotSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response({"message": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        calendar_owner_email = serializer.validated_data.get('owner_email').lower()
+        invitee_email = serializer.validated_data.get('invitee_email')
+        start_time = serializer.validated_data.get('start_time')
+        minutes = serializer.validated_data.get('minutes', settings.SLOT_HOLD_MINUTES)
+
+        if start_time.replace(tzinfo=None) < datetime.now():
+            return Response({"message": "Appointments cannot be scheduled in the past."}, status=status.HTTP_400_BAD_REQUEST)
+
+        calendar_owner = get_calendar_owner(calendar_owner_email)
+        if not calendar_owner:
+            return Response({"message": "Calendar owner not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        db = calendar_owner._state.db
+
+        with transaction.atomic(using=db):
+            conflict = find_slot_conflict(calendar_owner, start_time)
+            if conflict:
+                return Response({"message": conflict}, status=status.HTTP_400_BAD_REQUEST)
+
+            if SlotHold.objects.using(db).filter(
+                calendar_owner=calendar_owner,
+                invitee_email__iexact=invitee_email,
+                expires_at__gt=django_timezone.now()
+            ).exists():
+                return Response({"message": "This invitee already holds a slot of this calendar owner."},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+            hold = SlotHold.objects.using(db).create(
+                calendar_owner=calendar_owner,
+                invitee_email=invitee_email,
+                start_time=start_time,
+                end_time=start_time + timedelta(hours=1),
+                expires_at=django_timezone.now() + timedelta(minutes=minutes)
+            )
+            transaction.on_commit(lambda: update_cached_slots(
+                calendar_owner, start_time.date(), booked=[start_time], held_until=hold.expires_at
+            ), using=db)
+
+        return Response({
+            "message": "Slot held successfully!",
+            "hold_token": str(hold.token),
+            "expires_at": hold.expires_at
+        }, status=status.HTTP_201_CREATED)
+
+class CancelAppointmentAPI(APIView):
+    def post(self, request):
+        """
+        Cancel an upcoming appointment and free its slot.
+        -----------------------------------------------------------------
+        Request Example:
+            POST /api/appointment/cancel/
+            {
+                "owner_email": "himanshu.anuragi@mail.com",
+                "start_time": "2024-10-15T09:00:00"
+            }
+        -----------------------------------------------------------------
+        -----------------------------------------------------------------
+        Response Example:
+            {
+                "message": "Appointment cancelled successfully!"
+            }
+        -----------------------------------------------------------------
+        """
+        serializer = CancelAppointmentSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response({"message": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        calendar_owner_email = serializer.validated_data.get('owner_email').lower()
+        start_time = serializer.validated_data.get('start_time')
 
-        factory = RequestFactory()
-        search_request = factory.get('/appointments/search/', {'owner_email': calendar_owner_email, 'date': start_time.date()})
-        search_response = SearchAvailableSlotsAPI().get(search_request)
+        if start_time.replace(tzinfo=None) < datetime.now():
+            return Response({"message": "Past appointments cannot be changed."}, status=status.HTTP_400_BAD_REQUEST)
 
-        available_slots = search_response.data
+        calendar_owner = get_calendar_owner(calendar_owner_email)
+        if not calendar_owner:
+            return Response({"message": "Calendar owner not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        if isinstance(available_slots, dict) and 'message' in available_slots:
-            return Response(available_slots, status=status.HTTP_400_BAD_REQUEST)
+        db = calendar_owner._state.db
 
-        if not any(slot['start_time'] == start_time.strftime("%Y-%m-%dT%H:%M:%S") for slot in available_slots):
-            return Response({"message": "This slot is not available."}, status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic(using=db):
+            appointment = Appointment.objects.using(db).filter(calendar_owner=calendar_owner, start_time=start_time).first()
+            if not appointment:
+                return Response({"message": "Appointment not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        Appointment.objects.create(
-            calendar_owner=calendar_owner,
-            invitee_name=invitee_name,
-            invitee_email=invitee_email,
-            start_time=start_time,
-            end_time=end_time
-        )
-        return Response({"message": "Appointment booked successfully!"}, status=status.HTTP_201_CREATED)
+            enqueue_event('appointment.cancelled', appointment_payload(appointment), using=db)
+            appointment.delete()
+            transaction.on_commit(
+                lambda: update_cached_slots(calendar_owner, start_time.date(), freed=[start_time]), using=db
+            )
+
+        return Response({"message": "Appointment cancelled successfully!"}, status=status.HTTP_200_OK)
+
+class RescheduleAppointmentAPI(APIView):
+    def post(self, request):
+        """
+        Move an upcoming appointment to another slot. The new slot is checked and claimed and the
+        old one released in a single transaction, so no other booking can take either in between.
+        -----------------------------------------------------------------
+        Request Example:
+            POST /api/appointment/reschedule/
+            {
+                "owner_email": "himanshu.anuragi@mail.com",
+                "start_time": "2024-10-15T09:00:00",
+                "new_start_time": "2024-10-15T11:00:00"
+            }
+        -----------------------------------------------------------------
+        -----------------------------------------------------------------
+        Response Example:
+            {
+                "message": "Appointment rescheduled successfully!"
+            }
+        -----------------------------------------------------------------
+        """
+        serializer = RescheduleAppointmentSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response({"message": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        calendar_owner_email = serializer.validated_data.get('owner_email').lower()
+        start_time = serializer.validated_data.get('start_time')
+        new_start_time = serializer.validated_data.get('new_start_time')
+
+        if min(start_time, new_start_time).replace(tzinfo=None) < datetime.now():
+            return Response({"message": "Past appointments cannot be changed."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if new_start_time == start_time:
+            return Response({"message": "The appointment already starts at this time."}, status=status.HTTP_400_BAD_REQUEST)
+
+        calendar_owner = get_calendar_owner(calendar_owner_email)
+        if not calendar_owner:
+            return Response({"message": "Calendar owner not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        db = calendar_owner._state.db
+
+        try:
+            with transaction.atomic(using=db):
+                appointment = Appointment.objects.using(db).filter(calendar_owner=calendar_owner, start_time=start_time).first()
+                if not appointment:
+                    return Response({"message": "Appointment not found"}, status=status.HTTP_404_NOT_FOUND)
+
+                conflict = find_slot_conflict(calendar_owner, new_start_time, exclude=appointment)
+                if conflict:
+                    return Response({"message": conflict}, status=status.HTTP_400_BAD_REQUEST)
+
+                appointment.start_time = new_start_time
+                appointment.end_time = new_start_time + timedelta(hours=1)
+                appointment.save(update_fields=['start_time', 'end_time'])
+
+                enqueue_event('appointment.rescheduled', {
+                    **appointment_payload(appointment),
+                    'previous_start_time': start_time.isoformat()
+                }, using=db)
+                transaction.on_commit(lambda: (
+                    update_cached_slots(calendar_owner, new_start_time.date(), booked=[new_start_time]),
+                    update_cached_slots(calendar_owner, start_time.date(), freed=[start_time])
+                ), using=db)
+        except IntegrityError:
+            return Response({"message": "This slot is already booked."}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({"message": "Appointment rescheduled successfully!"}, status=status.HTTP_200_OK)
 
 class ListUpcomingAppointmentsAPI(APIView):
     def get(self, request):
@@ -245,16 +495,126 @@ class ListUpcomingAppointmentsAPI(APIView):
         calendar_owner_email = serializer.validated_data['owner_email']
         calendar_owner_email = calendar_owner_email.lower()
 
-        calendar_owner = CalendarOwner.objects.filter(email=calendar_owner_email).first()
+        calendar_owner = get_calendar_owner(calendar_owner_email)
         if not calendar_owner:
             return Response({"message": "Calendar owner not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        today = datetime.utcnow().date()
+        today = datetime.combine(datetime.utcnow().date(), datetime.min.time(), tzinfo=timezone.utc)
 
-        upcoming_appointments = Appointment.objects.filter(
+        upcoming_appointments = Appointment.objects.using(calendar_owner._state.db).filter(
             calendar_owner=calendar_owner,
-            start_time__date__gte=today
+            start_time__gte=today
         ).order_by('start_time')
 
         serializer = AppointmentSerializer(upcoming_appointments, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+class AppointmentHistoryAPI(APIView):
+    def get(self, request):
+        """
+        List all appointments of a calendar owner, past and upcoming, ordered by start time.
+        Appointments moved out by `manage.py archive_appointments` are only included
+        when `include_archived=true` is passed.
+        --------------------------------------------------------------------
+        Request Example:
+            GET /api/appointments/history?owner_email=john.doe@example.com&include_archived=true
+        --------------------------------------------------------------------
+        --------------------------------------------------------------------
+        Response Example:
+            [
+                {
+                    "invitee_name": "Invitee",
+                    "invitee_email": "invitee@mail.com",
+                    "start_time": "2023-10-15T09:00:00Z",
+                    "end_time": "2023-10-15T10:00:00Z",
+                    "archived": true
+                }
+            ]
+        --------------------------------------------------------------------
+        """
+        serializer = AppointmentHistorySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            raise ValidationError(serializer.errors)
+
+        calendar_owner_email = serializer.validated_data['owner_email'].lower()
+        include_archived = serializer.validated_data['include_archived']
+
+        calendar_owner = get_calendar_owner(calendar_owner_email)
+        if not calendar_owner:
+            return Response({"message": "Calendar owner not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        fields = ('invitee_name', 'invitee_email', 'start_time', 'end_time')
+
+        db = calendar_owner._state.db
+
+        history = Appointment.objects.using(db).filter(calendar_owner=calendar_owner) \
+            .annotate(archived=Value(False, output_field=BooleanField())) \
+            .values(*fields, 'archived')
+
+        if include_archived:
+            archived_appointments = AppointmentArchive.objects.using(db).filter(calendar_owner=calendar_owner) \
+                .annotate(archived=Value(True, output_field=BooleanField())) \
+                .values(*fields, 'archived')
+            history = history.union(archived_appointments, all=True)
+
+        serializer = AppointmentHistoryEntrySerializer(history.order_by('start_time'), many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+class OwnerUtilizationAPI(APIView):
+    def get(self, request):
+        """
+        Report booked hours against available hours for one or more calendar owners over a date range
+        (both dates inclusive, UTC). Pass `owner_email` once per owner, or leave it out to report on all owners.
+        Everything is aggregated in the database, archived appointments included, in the same number of queries for any number of owners
+        on each shard; shards are queried in parallel.
+        --------------------------------------------------------------------
+        Request Example:
+            GET /api/analytics/utilization/?owner_email=himanshu.anuragi@mail.com&start_date=2024-10-14&end_date=2024-10-20
+        --------------------------------------------------------------------
+        --------------------------------------------------------------------
+        Response Example:
+            [
+                {
+                    "owner_name": "Himanshu",
+                    "owner_email": "himanshu.anuragi@mail.com",
+                    "booked_hours": 2.0,
+                    "available_hours": 7.0,
+                    "utilization": 28.57,
+                    "busiest_hours": [
+                        {"hour": 9, "appointments": 1},
+                        {"hour": 13, "appointments": 1}
+                    ],
+                    "daily_booked_hours": {
+                        "2024-10-14": 2.0
+                    }
+                }
+            ]
+        --------------------------------------------------------------------
+        """
+        serializer = OwnerUtilizationSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response({"message": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        owner_emails = {email.lower() for email in serializer.validated_data.get('owner_email', [])}
+        start_date = serializer.validated_data['start_date']
+        end_date = serializer.validated_data['end_date']
+
+        def shard_report(db):
+            owners = CalendarOwner.objects.using(db).all()
+            if owner_emails:
+                owners = owners.filter(email__in=owner_emails)
+            return owner_utilization(owners, start_date, end_date)
+
+        shards = sorted({shard_for_email(email) for email in owner_emails}) if owner_emails else shard_aliases()
+        report = sorted(
+            (row for rows in run_on_shards(shard_report, shards) for row in rows),
+            key=lambda row: row['owner_email']
+        )
+
+        missing = owner_emails - {row['owner_email'] for row in report}
+        if missing:
+            return Response({"message": "Calendar owner not found", "owner_email": sorted(missing)},
+                            status=status.HTTP_404_NOT_FOUND)
+
+        return Response(report, status=status.HTTP_200_OK)
+
@@ -0,0 +1,43 @@
+"""
+Lazily built OpenAPI schema and documentation views.
+
+drf_yasg is only imported when one of these views is hit for the first time, so worker
+processes that never serve the docs do not pay for it at boot. The generated schema is
+cached for settings.API_SCHEMA_CACHE_TIMEOUT seconds.
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from rest_framework import permissions
+
+
+@lru_cache(maxsize=None)
+def get_view(ui=None):
+    from drf_yasg import openapi
+    from drf_yasg.views import get_schema_view
+
+    schema_view = get_schema_view(
+        openapi.Info(
+            title="Meetings",
+            default_version='v1',
+            description="Deal Meridian Assignment",
+        ),
+        public=True,
+        permission_classes=(permissions.AllowAny,),
+    )
+
+    if ui is None:
+        return schema_view.without_ui(cache_timeout=settings.API_SCHEMA_CACHE_TIMEOUT)
+    return schema_view.with_ui(ui, cache_timeout=settings.API_SCHEMA_CACHE_TIMEOUT)
+
+
+def schema(request, format=None):
+    return get_view()(request, format=format)
+
+
+def swagger_ui(request):
+    return get_view('swagger')(request)
+
+
+def redoc(request):
+    return get_view('redoc')(request)
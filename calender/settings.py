@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -81,9 +83,31 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Take the write lock when a transaction starts, so checking a slot and claiming it cannot interleave.
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
+# Owner sharding
+# With CALENDAR_SHARDS > 1, calendar owners are spread over that many SQLite files by a hash
+# of their email: 'default' plus 'shard_1' ... 'shard_<N-1>'. Each file has its own write lock,
+# so bookings of owners on different shards do not wait for each other.
+# Create the tables on every shard with `python manage.py migrate_shards`.
+CALENDAR_SHARDS = int(os.environ.get('CALENDAR_SHARDS', 1))
+
+# `manage.py test` always declares 'shard_1', so the sharding tests can spread owners over two
+# databases with override_settings(CALENDAR_SHARD_ALIASES=...) while other tests use one.
+TESTING = sys.argv[1:2] == ['test']
+
+for shard in range(1, max(CALENDAR_SHARDS, 2) if TESTING else CALENDAR_SHARDS):
+    DATABASES[f'shard_{shard}'] = dict(DATABASES['default'], NAME=BASE_DIR / f'db_shard_{shard}.sqlite3')
+
+CALENDAR_SHARD_ALIASES = ['default'] + [f'shard_{shard}' for shard in range(1, CALENDAR_SHARDS)]
+
+DATABASE_ROUTERS = ['appointments.routers.OwnerShardRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -121,7 +145,66 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# API documentation
+# The swagger/redoc UIs are only routed when API_DOCS_ENABLED is set. The OpenAPI
+# schema itself is built on its first request and cached for API_SCHEMA_CACHE_TIMEOUT seconds.
+
+API_DOCS_ENABLED = True
+
+API_SCHEMA_CACHE_TIMEOUT = 0
+
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Slot search
+# Search results are cached per owner and date for SEARCH_SLOTS_CACHE_TTL seconds
+# and patched as soon as a booking, cancellation or reschedule commits.
+
+SEARCH_SLOTS_CACHE_TTL = 30
+
+# Token bucket per client: RATE tokens are refilled per second up to BURST.
+# Use 'appointments.throttling.CacheTokenBucketBackend' with a shared cache
+# (e.g. Redis) to limit clients across all worker processes.
+SEARCH_RATE_LIMIT = {
+    'RATE': 5,
+    'BURST': 20,
+    'BACKEND': 'appointments.throttling.InMemoryTokenBucketBackend',
+}
+
+
+# Slot holds
+# A hold reserves a slot for SLOT_HOLD_MINUTES unless the request asks for
+# another duration, up to SLOT_HOLD_MAX_MINUTES.
+
+SLOT_HOLD_MINUTES = 10
+
+SLOT_HOLD_MAX_MINUTES = 30
+
+# Holds block a slot for everybody else, so they are rate limited per client like search,
+# and an invitee can hold only one slot of an owner at a time.
+HOLD_RATE_LIMIT = {
+    'RATE': 0.2,
+    'BURST': 5,
+    'BACKEND': 'appointments.throttling.InMemoryTokenBucketBackend',
+}
+
+
+# Booking notifications
+# Events are written to the OutboxEvent table together with the booking and
+# delivered by `python manage.py run_outbox_worker`.
+
+OUTBOX_WEBHOOK_URLS = [url for url in os.environ.get('OUTBOX_WEBHOOK_URLS', '').split(',') if url]
+
+OUTBOX_WEBHOOK_TIMEOUT = 5
+
+OUTBOX_MAX_ATTEMPTS = 8
+
+# Seconds before the first retry, doubled after every failed attempt up to OUTBOX_RETRY_BACKOFF_MAX.
+OUTBOX_RETRY_BACKOFF = 2
+
+OUTBOX_RETRY_BACKOFF_MAX = 600
+
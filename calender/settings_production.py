@@ -0,0 +1,43 @@
+"""
+Production settings for calender project.
+
+Select with DJANGO_SETTINGS_MODULE=calender.settings_production. Workers boot without the
+admin and the API docs apps, and the OpenAPI schema is built on its first request and then
+cached, which keeps worker cold starts short.
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import HOLD_RATE_LIMIT, INSTALLED_APPS, SEARCH_RATE_LIMIT, SECRET_KEY
+
+DEBUG = False
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', SECRET_KEY)
+
+ALLOWED_HOSTS = [host for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',') if host]
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in ('django.contrib.admin', 'drf_yasg')]
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+}
+
+API_DOCS_ENABLED = False
+
+API_SCHEMA_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Cached search results and their patches must be seen by every worker process. With a shared
+# Redis cache (DJANGO_REDIS_URL, needs the `redis` package) search results are cached and rate
+# limits are shared; without one, each worker would serve its own stale copy, so caching is off.
+if os.environ.get('DJANGO_REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['DJANGO_REDIS_URL'],
+        }
+    }
+    SEARCH_RATE_LIMIT = dict(SEARCH_RATE_LIMIT, BACKEND='appointments.throttling.CacheTokenBucketBackend')
+    HOLD_RATE_LIMIT = dict(HOLD_RATE_LIMIT, BACKEND='appointments.throttling.CacheTokenBucketBackend')
+else:
+    SEARCH_SLOTS_CACHE_TTL = 0
@@ -14,29 +14,18 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
-from django.urls import path, re_path
-from django.urls import include, path
+from django.conf import settings
+from django.urls import include, path, re_path
 
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-
-schema_view = get_schema_view(
-   openapi.Info(
-      title="Meetings",
-      default_version='v1',
-      description="Deal Meridian Assignment",
-   ),
-   public=True,
-   permission_classes=(permissions.AllowAny,),
-)
+from . import schema
 
 urlpatterns = [
-    # path('admin/', admin.site.urls),
     path('api/', include("appointments.urls")),
-    re_path(r'^swagger(?P<format>\.json|\.yaml)$', schema_view.without_ui(cache_timeout=0), name='schema-json'),
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
-
+    re_path(r'^swagger(?P<format>\.json|\.yaml)$', schema.schema, name='schema-json'),
 ]
+
+if settings.API_DOCS_ENABLED:
+    urlpatterns += [
+        path('swagger/', schema.swagger_ui, name='schema-swagger-ui'),
+        path('redoc/', schema.redoc, name='schema-redoc'),
+    ]